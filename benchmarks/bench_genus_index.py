@@ -0,0 +1,70 @@
+"""Genus -> family index: load time and batch lookups vs a dict of sets.
+
+Uses the index of data/species_list.csv and a synthetic one the size of a
+full GBIF animal crawl (GENERA genera over a few thousand families), and
+checks QUERIES (genus, family) pairs, half of them real, both ways.
+
+Run from the repository root:
+    python -m benchmarks.bench_genus_index [QUERIES] [GENERA]
+"""
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+from genus_index import GenusFamilyIndex, SOURCES
+
+QUERIES = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+GENERA = int(sys.argv[2]) if len(sys.argv) > 2 else 300_000
+SEED = 0
+
+
+def synthetic_pairs(n, rng):
+    genera = [f"Genus{i:07d}" for i in range(n)]
+    families = np.array([f"Family{i:05d}" for i in range(max(n // 60, 1))])
+    pairs = list(zip(genera, families[rng.integers(len(families), size=n)]))
+    pairs += list(zip(genera[:n // 100], families[rng.integers(len(families), size=n // 100)]))   # a few shared genera
+    return pairs
+
+
+def bench(label, index, rng):
+    pairs = index.pairs
+    n = len(index.families)
+    real = rng.choice(pairs, QUERIES // 2)
+    genera = np.concatenate([index.genera[real // n], rng.choice(index.genera, QUERIES - len(real))])
+    families = np.concatenate([index.families[real % n], rng.choice(index.families, QUERIES - len(real))])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "index.npz")
+        index.save(path)
+        start = time.perf_counter()
+        loaded = GenusFamilyIndex.load(path)
+        load_ms = 1000 * (time.perf_counter() - start)
+        size = os.path.getsize(path)
+
+    start = time.perf_counter()
+    found = loaded.belongs(genera, families)
+    batch = time.perf_counter() - start
+
+    table = {}
+    for k in pairs:
+        table.setdefault(str(index.genera[k // n]), set()).add(str(index.families[k % n]))
+    g, f = genera.tolist(), families.tolist()
+    start = time.perf_counter()
+    expected = [fam in table.get(gen, ()) for gen, fam in zip(g, f)]
+    per_row = time.perf_counter() - start
+
+    assert np.array_equal(found, expected)
+    print(f"{label}: {len(index)} genera, {n} families, {len(pairs)} pairs, {size / 1e6:.1f} MB on disk")
+    print(f"  load              {load_ms:7.1f} ms")
+    print(f"  dict of sets      {per_row:7.2f} s   {QUERIES / per_row:11.0f} lookups/s")
+    print(f"  belongs (batch)   {batch:7.2f} s   {QUERIES / batch:11.0f} lookups/s")
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(SEED)
+    start = time.perf_counter()
+    index = GenusFamilyIndex.build([p for p in SOURCES if os.path.exists(p)])
+    print(f"{QUERIES} queries; built the index of {', '.join(SOURCES)} in {time.perf_counter() - start:.2f} s")
+    bench("species_list", index, rng)
+    bench("synthetic crawl", GenusFamilyIndex.from_pairs(synthetic_pairs(GENERA, rng)), rng)
@@ -0,0 +1,75 @@
+"""Known-name index: load time and batch novelty checks vs Python sets.
+
+Checks QUERIES generated-looking names (a third copied from the known
+species, a third recombining a known genus and epithet, a third new)
+against the index of data/species_with_description_fixed.csv and against
+a synthetic one of NAMES species, the size of a large crawl.
+
+Run from the repository root:
+    python -m benchmarks.bench_name_index [QUERIES] [NAMES]
+"""
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+from name_index import NameIndex, SOURCES
+
+QUERIES = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+NAMES = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000_000
+SEED = 0
+
+
+def names(values):
+    return np.array(values.to_pylist(), dtype=object)
+
+
+def queries(index, rng):
+    known = names(index.binomials)[rng.integers(len(index.binomials), size=QUERIES // 3)]
+    genus, epithet = zip(*(name.split() for name in known))
+    mixed_genera = names(index.genera)[rng.integers(len(index.genera), size=QUERIES // 3)]
+    mixed_epithets = names(index.epithets)[rng.integers(len(index.epithets), size=QUERIES // 3)]
+    n_new = QUERIES - 2 * (QUERIES // 3)
+    new_genera = np.array([f"Novus{i}" for i in rng.integers(1_000_000, size=n_new)], dtype=object)
+    new_epithets = np.array([f"novus{i}" for i in rng.integers(1_000_000, size=n_new)], dtype=object)
+    return (np.concatenate([np.array(genus, dtype=object), mixed_genera, new_genera]),
+            np.concatenate([np.array(epithet, dtype=object), mixed_epithets, new_epithets]))
+
+
+def bench(label, index, rng):
+    genera, epithets = queries(index, rng)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "index.arrow")
+        index.save(path)
+        start = time.perf_counter()
+        loaded = NameIndex.load(path)
+        load_ms = 1000 * (time.perf_counter() - start)
+        size = os.path.getsize(path)
+
+    start = time.perf_counter()
+    found = loaded.check(genera, epithets)
+    batch = time.perf_counter() - start
+
+    sets = [set(index.binomials.to_pylist()), set(index.genera.to_pylist()), set(index.epithets.to_pylist())]
+    g, e = genera.tolist(), epithets.tolist()
+    start = time.perf_counter()
+    expected = ([f"{a} {b}" in sets[0] for a, b in zip(g, e)], [a in sets[1] for a in g], [b in sets[2] for b in e])
+    per_row = time.perf_counter() - start
+
+    assert all(np.array_equal(a, b) for a, b in zip(found, expected))
+    print(f"{label}: {len(index.binomials)} binomials, {len(index.genera)} genera, "
+          f"{len(index.epithets)} epithets, {size / 1e6:.1f} MB on disk; known: {found[0].mean():.1%}")
+    print(f"  load              {load_ms:7.1f} ms")
+    print(f"  Python sets       {per_row:7.2f} s   {QUERIES / per_row:11.0f} names/s")
+    print(f"  NameIndex.check   {batch:7.2f} s   {QUERIES / batch:11.0f} names/s")
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(SEED)
+    start = time.perf_counter()
+    index = NameIndex.build([p for p in SOURCES if os.path.exists(p)])
+    print(f"{QUERIES} queries; built the index of {', '.join(SOURCES)} in {time.perf_counter() - start:.2f} s")
+    bench("species_with_description_fixed", index, rng)
+    synthetic = [f"Genus{g} epithet{e}" for g, e in zip(rng.integers(NAMES // 20, size=NAMES),
+                                                        rng.integers(NAMES // 4, size=NAMES))]
+    bench("synthetic crawl", NameIndex.from_names(synthetic), rng)
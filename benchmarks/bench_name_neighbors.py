@@ -0,0 +1,63 @@
+"""Closest known species: NameNeighbors vs a per-name scan with a Python edit distance.
+
+Builds QUERIES generated-looking names from the known binomials (two thirds
+with up to five random character edits, one third recombining a known
+genus and a known epithet), finds the closest known species of each with
+NameNeighbors and checks a sample against the full scan.
+
+Run from the repository root:
+    python -m benchmarks.bench_name_neighbors [QUERIES] [SAMPLE]
+"""
+import sys
+import time
+import string
+import numpy as np
+from name_index import load_name_index
+from name_neighbors import NameNeighbors, levenshtein
+
+QUERIES = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+SAMPLE = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+SEED = 0
+
+
+def mutate(name, rng):
+    chars = list(name)
+    for _ in range(rng.integers(6)):
+        op, pos = rng.integers(3), rng.integers(len(chars) + 1)
+        letter = string.ascii_lowercase[rng.integers(26)]
+        if op == 0 and pos < len(chars):
+            chars[pos] = letter
+        elif op == 1:
+            chars.insert(pos, letter)
+        elif pos < len(chars):
+            del chars[pos]
+    return "".join(chars)
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(SEED)
+    known = load_name_index().binomials.to_pylist()
+    start = time.perf_counter()
+    neighbors = NameNeighbors(known)
+    build = time.perf_counter() - start
+
+    n_mutated = 2 * QUERIES // 3
+    names = [mutate(known[i], rng) for i in rng.integers(len(known), size=n_mutated)]
+    names += [known[i].split()[0] + " " + known[j].split()[1]
+              for i, j in rng.integers(len(known), size=(QUERIES - n_mutated, 2))]
+
+    start = time.perf_counter()
+    closest, distance = neighbors.nearest(names)
+    batch = time.perf_counter() - start
+
+    sample = rng.choice(len(names), size=min(SAMPLE, len(names)), replace=False)
+    start = time.perf_counter()
+    scan = [min(levenshtein(names[i], k, np.inf) for k in known) for i in sample]
+    per_name = (time.perf_counter() - start) / len(sample)
+
+    assert np.array_equal(scan, distance[sample])
+    print(f"{QUERIES} names vs {len(known)} known species (index built in {build:.2f} s)")
+    print(f"  per-name scan     {per_name * QUERIES:7.2f} s   {1 / per_name:9.0f} names/s   (extrapolated from {len(sample)} names)")
+    print(f"  NameNeighbors     {batch:7.2f} s   {QUERIES / batch:9.0f} names/s")
+    print(f"  distance: mean {distance.mean():.2f}, exact copies {np.mean(distance == 0):.1%}, "
+          f"1-2 edits {np.mean((distance >= 1) & (distance <= 2)):.1%}")
@@ -0,0 +1,79 @@
+"""Padding ratio and training tokens/sec: fixed MAX_LENGTH padding vs dynamic padding.
+
+Run from the repository root:
+    python -m benchmarks.bench_padding [CSV_PATH] [MODEL_NAME] [STEPS]
+"""
+import sys
+import time
+import numpy as np
+import torch
+from torch.utils.data import DataLoader, RandomSampler
+from transformers import GPT2TokenizerFast, GPT2LMHeadModel
+from binomial.dataset import BinomialCollator, LengthBucketSampler
+from binomial.prepare import load_datasets
+
+CSV_PATH = sys.argv[1] if len(sys.argv) > 1 else "data/species_with_description_fixed.csv"
+MODEL_NAME = sys.argv[2] if len(sys.argv) > 2 else "gpt2"
+STEPS = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+MAX_LENGTH = 64
+BATCH_SIZE = 8
+SEED = 42
+
+
+class FixedLengthCollator(BinomialCollator):
+    """The old behaviour: every row padded to MAX_LENGTH"""
+
+    def __call__(self, features):
+        batch = super().__call__(features)
+        pad = MAX_LENGTH - batch["input_ids"].shape[1]
+        if pad > 0:
+            batch["input_ids"] = torch.nn.functional.pad(batch["input_ids"], (0, pad), value=self.pad_token_id)
+            batch["attention_mask"] = torch.nn.functional.pad(batch["attention_mask"], (0, pad), value=0)
+            batch["labels"] = torch.nn.functional.pad(batch["labels"], (0, pad), value=-100)
+        return batch
+
+
+def run(name, loader, model):
+    real = padded = 0
+    for batch in loader:
+        real += int(batch["attention_mask"].sum())
+        padded += batch["attention_mask"].numel()
+
+    model.train()
+    optimizer = torch.optim.AdamW(model.parameters(), lr=5e-5)
+    steps = timed_tokens = 0
+    start = time.perf_counter()
+    for batch in loader:
+        loss = model(**batch).loss
+        loss.backward()
+        optimizer.step()
+        optimizer.zero_grad()
+        timed_tokens += int(batch["attention_mask"].sum())
+        steps += 1
+        if steps >= STEPS:
+            break
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28} padding ratio {1 - real / padded:6.1%}   {timed_tokens / elapsed:9.1f} tokens/sec")
+
+
+if __name__ == "__main__":
+    torch.manual_seed(SEED)
+    tokenizer = GPT2TokenizerFast.from_pretrained(MODEL_NAME)
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    dataset, _ = load_datasets(tokenizer, table_path=CSV_PATH, max_length=MAX_LENGTH, seed=SEED)
+    lengths = dataset.lengths
+    print(f"{len(dataset)} rows, length mean {lengths.mean():.1f}, p95 {np.percentile(lengths, 95):.0f}, "
+          f"max {lengths.max()} (MAX_LENGTH={MAX_LENGTH})")
+
+    model = GPT2LMHeadModel.from_pretrained(MODEL_NAME)
+    generator = torch.Generator().manual_seed(SEED)
+    run("fixed MAX_LENGTH padding",
+        DataLoader(dataset, BATCH_SIZE, sampler=RandomSampler(dataset, generator=generator),
+                   collate_fn=FixedLengthCollator(tokenizer.pad_token_id)), model)
+    run("dynamic padding",
+        DataLoader(dataset, BATCH_SIZE, sampler=RandomSampler(dataset, generator=generator),
+                   collate_fn=BinomialCollator(tokenizer.pad_token_id)), model)
+    run("dynamic + length buckets",
+        DataLoader(dataset, BATCH_SIZE, sampler=LengthBucketSampler(lengths, BATCH_SIZE, seed=SEED),
+                   collate_fn=BinomialCollator(tokenizer.pad_token_id)), model)
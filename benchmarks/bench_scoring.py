@@ -0,0 +1,87 @@
+"""Semantic scoring of generated names: per-row substring scans vs the vectorized NameScorer.
+
+Builds ROWS (description, family, generated_name) rows from the species
+table, pairing each description with a known genus and either a known
+epithet or one of the GPT-2 Latin roots (scoring_profiles.py), scores them
+both ways with the same tables and checks the scores agree. The second
+run adds every epithet of data/epithet_cache.json as a Latin root, with
+the words of its meaning, to show how both scale with the tables.
+
+Run from the repository root:
+    python -m benchmarks.bench_scoring [ROWS]
+"""
+import re
+import sys
+import json
+import time
+import numpy as np
+import pandas as pd
+from genus_index import load_genus_index
+from name_scoring import NameScorer
+from scoring_profiles import GPT2_DESCRIPTION_KEYWORDS, GPT2_LATIN_MEANINGS, GPT2_SEMANTIC_RULES
+from binomial.species_table import read_species
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+SEED = 0
+EPITHET_CACHE = "data/epithet_cache.json"
+STOP_WORDS = {"named", "after", "with", "from", "like", "resembling", "having", "that", "which"}
+
+
+def plain_tables(scorer):
+    rules = [(list(r["word"].unique()), list(r["term"].unique())) for _, r in scorer.rules.groupby("rule")]
+    return list(scorer.keywords["keyword"]), list(zip(scorer.meanings["root"], scorer.meanings["meaning"])), rules
+
+
+def score_row(tables, description, name):
+    """The old behaviour: scan every keyword, root and rule for one row"""
+    keywords, meanings, rules = tables
+    desc = description.lower()
+    epithet = (name.split()[1:2] or [""])[0].lower()
+    n_keywords = sum(word in desc for word in keywords)
+    n_matches = sum(root in epithet and meaning in desc for root, meaning in meanings)
+    n_matches += sum(any(w in desc for w in words) and any(t in epithet for t in terms) for words, terms in rules)
+    return min(n_matches / n_keywords, 1.0) if n_keywords else 0.5
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(SEED)
+    table = read_species("data/species_with_description_fixed.csv",
+                         columns=["canonicalName", "family", "epithet", "description"]).dropna()
+    rows = table.sample(ROWS, replace=True, random_state=SEED)
+    genera = table["canonicalName"].str.split().str[0].to_numpy()[rng.integers(len(table), size=ROWS)]
+    epithets = np.concatenate([table["epithet"].to_numpy(dtype=object), list(GPT2_LATIN_MEANINGS)])
+    df = pd.DataFrame({
+        "description": rows["description"].to_numpy(),
+        "family": rows["family"].to_numpy(),
+        "generated_name": genera + " " + epithets[rng.integers(len(epithets), size=ROWS)],
+    })
+
+    large = dict(GPT2_LATIN_MEANINGS)
+    with open(EPITHET_CACHE, encoding="utf-8") as f:
+        for epithet, meaning in json.load(f).items():
+            words = [w for w in re.findall(r"[a-z]{4,}", str(meaning).lower()) if w not in STOP_WORDS]
+            if words and epithet not in large:
+                large[epithet] = words
+    genus_index = load_genus_index()
+    small_scorer = NameScorer(GPT2_DESCRIPTION_KEYWORDS, GPT2_LATIN_MEANINGS, genus_index,
+                              GPT2_SEMANTIC_RULES, score="ratio")
+    large_scorer = NameScorer(GPT2_DESCRIPTION_KEYWORDS, large, genus_index,
+                              GPT2_SEMANTIC_RULES, score="ratio")
+
+    print(f"{ROWS} rows")
+    for name, scorer in [(f"{len(GPT2_LATIN_MEANINGS)} Latin roots", small_scorer),
+                         (f"{len(large)} Latin roots", large_scorer)]:
+        start = time.perf_counter()
+        results = scorer.score_frame(df)
+        vectorized = time.perf_counter() - start
+
+        sample = df.head(min(ROWS, 10_000))
+        tables = plain_tables(scorer)
+        start = time.perf_counter()
+        scores = [score_row(tables, d, n) for d, n in zip(sample["description"], sample["generated_name"])]
+        per_row = (time.perf_counter() - start) * ROWS / len(sample)
+
+        assert np.allclose(scores, results["semantic_score"].to_numpy()[:len(sample)])
+        print(name)
+        print(f"  per-row scans     {per_row:7.2f} s   {ROWS / per_row:9.0f} rows/s   (extrapolated from {len(sample)} rows)")
+        print(f"  NameScorer        {vectorized:7.2f} s   {ROWS / vectorized:9.0f} rows/s   (all three metrics)")
@@ -0,0 +1,66 @@
+"""Inference server on localhost: one-at-a-time vs micro-batched, under concurrent clients.
+
+Starts binomial.server in-process on a free port, sends REQUESTS single-pair
+requests from CLIENTS threads and prints throughput plus the server's own
+latency / batch / queue metrics. The requests cycle through a handful of
+descriptions, so the last run shows what the result cache saves.
+
+Run from the repository root:
+    python -m benchmarks.bench_server [MODEL_DIR] [CLIENTS] [REQUESTS]
+"""
+import sys
+import json
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from binomial.generation import MODEL_DIR
+from binomial.generation import loaded_fingerprint
+from binomial.server import serve, model_generate_fn
+
+MODEL = sys.argv[1] if len(sys.argv) > 1 else MODEL_DIR
+CLIENTS = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+REQUESTS = int(sys.argv[3]) if len(sys.argv) > 3 else 128
+DESCRIPTIONS = [
+    ("a large brown bear with a scar on its paw", "Ursidae"),
+    ("a tiny gray mouse living in a barn", "Muridae"),
+    ("a fast-running desert fox", "Canidae"),
+    ("a sleek black panther that hunts at night", "Felidae"),
+    ("a small deer with twisted antlers", "Cervidae"),
+    ("a striped horse from the savanna", "Equidae"),
+]
+
+
+def post(url, pair):
+    body = json.dumps({"description": pair[0], "family": pair[1]}).encode("utf-8")
+    request = urllib.request.Request(url, body, {"Content-Type": "application/json"})
+    with urllib.request.urlopen(request) as r:
+        return json.load(r)
+
+
+def run(name, generate_fn, max_batch, max_wait_ms, cache_size=0):
+    server = serve(port=0, max_batch=max_batch, max_wait_ms=max_wait_ms, generate_fn=generate_fn,
+                   cache_size=cache_size, fingerprint=loaded_fingerprint(MODEL))
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        pairs = [DESCRIPTIONS[i % len(DESCRIPTIONS)] for i in range(REQUESTS)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(CLIENTS) as pool:
+            list(pool.map(lambda pair: post(f"{url}/generate", pair), pairs))
+        elapsed = time.perf_counter() - start
+        with urllib.request.urlopen(f"{url}/metrics") as r:
+            m = json.load(r)
+    finally:
+        server.close()
+    print(f"{name:<28} {REQUESTS / elapsed:7.1f} req/s  p50 {m['latency_p50_ms']:7.1f} ms  "
+          f"p99 {m['latency_p99_ms']:7.1f} ms  mean batch {m['mean_batch_size']:5.1f}  "
+          f"max queue {m['max_queue_depth']}" + (f"  cache hit rate {m['cache']['hit_rate']:.0%}" if "cache" in m else ""))
+
+
+if __name__ == "__main__":
+    generate_fn = model_generate_fn(MODEL)
+    generate_fn(DESCRIPTIONS[:1])   # warm-up
+    print(f"{CLIENTS} concurrent clients, {REQUESTS} requests, model {MODEL}")
+    run("one request per batch", generate_fn, 1, 0)
+    run("micro-batch 16 / 10 ms", generate_fn, 16, 10)
+    run("micro-batch 32 / 25 ms", generate_fn, 32, 25)
+    run("micro-batch 16 / 10 ms + cache", generate_fn, 16, 10, cache_size=1000)
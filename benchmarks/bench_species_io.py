@@ -0,0 +1,82 @@
+"""Load time and RSS of the species tables: CSV vs Parquet, all columns vs the prompt columns.
+
+Each table is repeated SCALE times into a scratch directory first, so the
+numbers reflect a GBIF-sized list rather than the bundled sample. Every
+load runs in a fresh process; RSS is the growth of its peak resident set
+(VmHWM in /proc/self/status, so Linux only) during the load.
+
+Run from the repository root:
+    python -m benchmarks.bench_species_io [SCALE]
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import multiprocessing as mp
+import pandas as pd
+from binomial.species_table import DATA_TABLES, PROMPT_COLUMNS, csv_to_parquet, read_species
+
+SCALE = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+REPEATS = 3
+
+
+def peak_rss_kb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+    return 0
+
+
+def load(path, columns, queue):
+    import pyarrow.parquet  # noqa: F401  import cost is not part of the load
+    before = peak_rss_kb()
+    start = time.perf_counter()
+    df = read_species(path, columns)
+    elapsed = time.perf_counter() - start
+    queue.put((elapsed, (peak_rss_kb() - before) / 1024, df.memory_usage(deep=True).sum() / 2 ** 20, len(df)))
+
+
+def measure(ctx, path, columns):
+    runs = []
+    for _ in range(REPEATS):
+        queue = ctx.Queue()
+        p = ctx.Process(target=load, args=(path, columns, queue))
+        p.start()
+        runs.append(queue.get())
+        p.join()
+    return min(runs)
+
+
+def scaled_copy(csv_path, encoding, out_dir):
+    df = pd.read_csv(csv_path, encoding=encoding)
+    out = os.path.join(out_dir, os.path.basename(csv_path))
+    with open(out, "w", encoding="utf-8", newline="") as f:
+        for i in range(SCALE):
+            df.to_csv(f, header=(i == 0), index=False)
+    return out
+
+
+if __name__ == "__main__":
+    ctx = mp.get_context("spawn")
+    out_dir = tempfile.mkdtemp(prefix="species_io_")
+    try:
+        for csv_path, encoding in DATA_TABLES.items():
+            if not os.path.exists(csv_path):
+                continue
+            csv = scaled_copy(csv_path, encoding, out_dir)
+            parquet = csv_to_parquet(csv)
+            print(f"\n{csv_path} x{SCALE}: CSV {os.path.getsize(csv) / 2 ** 20:.1f} MB, "
+                  f"Parquet {os.path.getsize(parquet) / 2 ** 20:.1f} MB")
+            for name, path, columns in [
+                ("CSV, all columns", csv, None),
+                ("CSV, prompt columns", csv, PROMPT_COLUMNS),
+                ("Parquet, all columns", parquet, None),
+                ("Parquet, prompt columns", parquet, PROMPT_COLUMNS),
+            ]:
+                elapsed, rss, frame, rows = measure(ctx, path, columns)
+                print(f"{name:<26} {rows} rows  load {1000 * elapsed:7.0f} ms  "
+                      f"RSS +{rss:6.1f} MB  dataframe {frame:6.1f} MB")
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
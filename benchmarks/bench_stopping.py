@@ -0,0 +1,68 @@
+"""Tokens and latency per name with and without the stop-at-binomial criterion.
+
+Generates names for the evaluation examples plus SAMPLES held-out rows,
+with and without the Latin epithet constraint. "tokens" counts the new
+tokens of each row up to its eos; "steps" counts what the batch actually
+decoded (steps x rows), which is what finished rows still pay for.
+
+Run from the repository root:
+    python -m benchmarks.bench_stopping [MODEL_DIR] [SAMPLES] [TABLE_PATH]
+"""
+import sys
+import time
+import torch
+from transformers import LogitsProcessorList, StoppingCriteriaList
+from binomial.constraint import BinomialStoppingCriteria, LatinEpithetLogitsProcessor
+from binomial.evaluation import EXAMPLES
+from binomial.generation import MODEL_DIR, MAX_NEW_TOKENS, extract_binomial, format_prompt, generated_lengths, load_model
+from binomial.prepare import TABLE_PATH, load_examples, prepare
+
+MODEL = sys.argv[1] if len(sys.argv) > 1 else MODEL_DIR
+SAMPLES = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+TABLE = sys.argv[3] if len(sys.argv) > 3 else TABLE_PATH
+BATCH_SIZE = 8
+NUM_BEAMS = 5
+
+
+def run(model, tokenizer, token_index, prompts, constrain, stop):
+    names, tokens = [], []
+    steps = 0
+    start = time.perf_counter()
+    for i in range(0, len(prompts), BATCH_SIZE):
+        enc = tokenizer(prompts[i:i + BATCH_SIZE], return_tensors="pt", padding=True).to(model.device)
+        processors = [LatinEpithetLogitsProcessor(tokenizer, token_index, NUM_BEAMS)] if constrain else []
+        criteria = [BinomialStoppingCriteria(tokenizer, token_index)] if stop else []
+        with torch.no_grad():
+            out = model.generate(**enc, max_new_tokens=MAX_NEW_TOKENS, num_beams=NUM_BEAMS, do_sample=False,
+                                 pad_token_id=tokenizer.pad_token_id,
+                                 logits_processor=LogitsProcessorList(processors),
+                                 stopping_criteria=StoppingCriteriaList(criteria))
+        prompt_len = enc["input_ids"].shape[1]
+        steps += (out.shape[1] - prompt_len) * out.shape[0]
+        tokens += generated_lengths(out, prompt_len, tokenizer.eos_token_id)
+        names += [extract_binomial(text) for text in tokenizer.batch_decode(out, skip_special_tokens=True)]
+    elapsed = time.perf_counter() - start
+    return names, sum(tokens) / len(prompts), steps / len(prompts), 1000 * elapsed / len(prompts)
+
+
+if __name__ == "__main__":
+    model, tokenizer, token_index = load_model(MODEL)
+    tokenizer.pad_token = tokenizer.eos_token
+    tokenizer.padding_side = "left"
+    pairs = list(EXAMPLES)
+    if SAMPLES:
+        cache_dir, _, val_idx = prepare(tokenizer, TABLE)
+        held_out = load_examples(cache_dir, val_idx[:SAMPLES])
+        pairs += list(zip(held_out["description"], held_out["family"].astype(str)))
+    prompts = [format_prompt(d, f) for d, f in pairs]
+    run(model, tokenizer, token_index, prompts[:BATCH_SIZE], True, True)   # warm-up
+    print(f"{len(prompts)} prompts, batch_size={BATCH_SIZE}, num_beams={NUM_BEAMS}, "
+          f"max_new_tokens={MAX_NEW_TOKENS}, model {MODEL}")
+    for constrain in (True, False):
+        before = None
+        for stop in (False, True):
+            names, tokens, steps, ms = run(model, tokenizer, token_index, prompts, constrain, stop)
+            changed = "" if before is None else f"  changed names {sum(a != b for a, b in zip(names, before))}"
+            before = before or names
+            label = ("latin constraint" if constrain else "unconstrained") + (" + stop" if stop else "")
+            print(f"{label:<24} {tokens:5.1f} tokens/name  {steps:5.1f} steps/name  {ms:7.1f} ms/name{changed}")
@@ -0,0 +1,36 @@
+"""Binomial name generation with a fine-tuned GPT-2.
+
+Entry points: train, generate, evaluate and serve (a local HTTP server). Submodules are imported on
+first attribute access, and torch / transformers only when a model is
+built or run, so `import binomial` and the constraint / generation
+modules load in milliseconds.
+"""
+import importlib
+
+_EXPORTS = {
+    "train": "training",
+    "generate": "generation",
+    "generate_binomials": "generation",
+    "load_model": "generation",
+    "format_prompt": "generation",
+    "extract_binomial": "generation",
+    "evaluate": "evaluation",
+    "serve": "server",
+    "ResultCache": "result_cache",
+    "LatinEpithetLogitsProcessor": "constraint",
+    "BinomialStoppingCriteria": "constraint",
+    "build_token_index": "constraint",
+    "load_token_index": "constraint",
+    "load_datasets": "prepare",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{_EXPORTS[name]}", __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
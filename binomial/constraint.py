@@ -0,0 +1,220 @@
+import os
+import re
+import json
+import hashlib
+import time
+
+# Latinized Epithet Constraint
+LATIN_EPITHET_REGEX = re.compile(r"^[a-z]+(us|a|um|is|ensis|ii)?$")
+
+INDEX_FILE = "token_class_index.pt"
+INDEX_VERSION = 2
+
+# token classes (bit flags)
+LATIN = 1            # decode([id]).strip().lower() matches LATIN_EPITHET_REGEX
+LEADING_SPACE = 2    # starts with whitespace
+TRAILING_SPACE = 4   # ends with whitespace
+WHITESPACE = 8       # whitespace only
+EOS = 16             # eos / special token, dropped by skip_special_tokens
+
+
+def tokenizer_fingerprint(tokenizer):
+    """Hash of the vocabulary, so an index is never reused with another tokenizer"""
+    vocab = sorted(tokenizer.get_vocab().items())
+    h = hashlib.sha1(json.dumps(vocab, ensure_ascii=False).encode("utf-8"))
+    h.update(f"{len(tokenizer)}:{tokenizer.eos_token_id}".encode())
+    return h.hexdigest()
+
+
+def build_token_index(tokenizer):
+    """Decode every token id once and classify it"""
+    import torch
+    n = len(tokenizer)
+    pieces = tokenizer.batch_decode([[i] for i in range(n)])
+    special = set(tokenizer.all_special_ids)
+    flags = torch.zeros(n, dtype=torch.uint8)
+    words = torch.zeros(n, dtype=torch.uint8)
+    for token_id, piece in enumerate(pieces):
+        f = 0
+        if token_id in special or token_id == tokenizer.eos_token_id:
+            f |= EOS
+        elif piece and not piece.strip():
+            f |= WHITESPACE | LEADING_SPACE | TRAILING_SPACE
+        else:
+            if piece[:1].isspace():
+                f |= LEADING_SPACE
+            if piece[-1:].isspace():
+                f |= TRAILING_SPACE
+        if LATIN_EPITHET_REGEX.match(piece.strip().lower()):
+            f |= LATIN
+        flags[token_id] = f
+        if not f & EOS:
+            words[token_id] = min(len(piece.split()), 255)
+    return {"version": INDEX_VERSION, "fingerprint": tokenizer_fingerprint(tokenizer),
+            "flags": flags, "words": words}
+
+
+def save_token_index(index, model_dir):
+    import torch
+    os.makedirs(model_dir, exist_ok=True)
+    torch.save(index, os.path.join(model_dir, INDEX_FILE))
+
+
+def load_token_index(tokenizer, model_dir):
+    """Load the index stored next to the model, rebuilding it if missing or stale"""
+    import torch
+    path = os.path.join(model_dir, INDEX_FILE)
+    fingerprint = tokenizer_fingerprint(tokenizer)
+    if os.path.exists(path):
+        index = torch.load(path, weights_only=True)
+        if index.get("version") == INDEX_VERSION and index.get("fingerprint") == fingerprint:
+            return index
+    index = build_token_index(tokenizer)
+    save_token_index(index, model_dir)
+    return index
+
+
+def name_state(text):
+    """(word count, inside a word) of the text after the last "Name:" """
+    if "Name:" not in text:
+        return 0, False
+    tail = text.split("Name:")[-1]
+    words = len(tail.split())
+    return words, words > 0 and not tail[-1].isspace()
+
+
+def advance_name_state(state, token_id, flags, words):
+    """name_state after appending token_id, from the token index alone"""
+    n_words, in_word = state
+    f = flags[token_id] if token_id < len(flags) else EOS
+    if f & EOS:
+        return state
+    if f & WHITESPACE:
+        return n_words, False
+    n = words[token_id]
+    if n == 0:
+        return state
+    if in_word and not f & LEADING_SPACE:
+        n -= 1
+    return n_words + n, not f & TRAILING_SPACE
+
+
+class LatinEpithetLogitsProcessor:
+    """Constrains generation to "Genus epithet": any token for the genus, then only
+    Latin-epithet tokens (LATIN in the index), then only eos once two words are out.
+
+    Each prompt is decoded once; afterwards the per-beam word count is
+    advanced from the token index using only the newly appended token.
+    Beam search reorders rows between steps, so states are looked up by
+    the generated suffix of their parent beam.
+
+    A plain (input_ids, scores) callable, which is all LogitsProcessorList
+    needs, so importing this module does not import transformers.
+    """
+
+    def __init__(self, tokenizer, index, num_beams=1):
+        import torch
+        self.tokenizer = tokenizer
+        self.num_beams = num_beams
+        self.flags = index["flags"].tolist()
+        self.words = index["words"].tolist()
+        n = len(self.flags)
+        self.latin_mask = (index["flags"] & LATIN) > 0
+        if not self.latin_mask.any():
+            self.latin_mask = torch.ones(n, dtype=torch.bool)
+        self.eos_id = tokenizer.eos_token_id
+        self._masks = {}
+        self.step_times = []
+        self.reset()
+
+    def reset(self):
+        self.prompt_len = None
+        self.last_len = None
+        self.states = {}
+
+    def _advance(self, state, token_id):
+        return advance_name_state(state, token_id, self.flags, self.words)
+
+    def _allowed_masks(self, vocab_size, device):
+        import torch
+        key = (vocab_size, device)
+        if key not in self._masks:
+            n = min(len(self.flags), vocab_size)
+            masks = torch.zeros(3, vocab_size, dtype=torch.bool)
+            masks[0, :n] = True
+            masks[1, :n] = self.latin_mask[:n]
+            masks[2, self.eos_id] = True
+            self._masks[key] = masks.to(device)
+        return self._masks[key]
+
+    def __call__(self, input_ids, scores):
+        import torch
+        start = time.perf_counter()
+        cur_len = input_ids.shape[1]
+        if self.last_len is None or cur_len != self.last_len + 1:
+            # first step of a new generate call
+            self.reset()
+            self.prompt_len = cur_len
+            texts = self.tokenizer.batch_decode(input_ids, skip_special_tokens=True)
+            for row, text in enumerate(texts):
+                self.states[(row // self.num_beams, ())] = name_state(text)
+            word_counts = [self.states[(row // self.num_beams, ())][0] for row in range(len(texts))]
+        else:
+            generated = input_ids[:, self.prompt_len:].tolist()
+            states = {}
+            word_counts = []
+            for row, gen in enumerate(generated):
+                batch_id = row // self.num_beams
+                key = (batch_id, tuple(gen))
+                state = states.get(key)
+                if state is None:
+                    state = self._advance(self.states[(batch_id, key[1][:-1])], gen[-1])
+                    states[key] = state
+                word_counts.append(state[0])
+            self.states = states
+        self.last_len = cur_len
+        masks = self._allowed_masks(scores.shape[-1], scores.device)
+        which = torch.tensor(word_counts, device=scores.device).clamp(max=2)
+        scores = scores.masked_fill(~masks[which], -float("inf"))
+        self.step_times.append(time.perf_counter() - start)
+        return scores
+
+
+class BinomialStoppingCriteria:
+    """Stopping criterion that finishes a row as soon as its name is a complete binomial.
+
+    The second word counts as complete once a delimiter follows it:
+    whitespace, eos or the start of a third word. The word state is
+    advanced from the token index like in LatinEpithetLogitsProcessor;
+    rows are looked up by their tokens minus the last one, since beam
+    search checks 2 * num_beams reordered candidates per prompt.
+
+    One bool per row is returned: greedy search stops finished rows, beam
+    search moves them to its finished hypotheses, and generate returns
+    once every row is done.
+    """
+
+    def __init__(self, tokenizer, index):
+        self.tokenizer = tokenizer
+        self.flags = index["flags"].tolist()
+        self.words = index["words"].tolist()
+        self.states = {}
+
+    def __call__(self, input_ids, scores=None, **kwargs):
+        import torch
+        states = {}
+        done = []
+        for row in input_ids.tolist():
+            parent = tuple(row[:-1])
+            state = self.states.get(parent)
+            if state is None:
+                # first step of a new generate call
+                state = name_state(self.tokenizer.decode(parent, skip_special_tokens=True))
+                self.states[parent] = state
+            token_id = row[-1]
+            words, in_word = advance_name_state(state, token_id, self.flags, self.words)
+            is_eos = token_id >= len(self.flags) or self.flags[token_id] & EOS
+            done.append(words > 2 or (words == 2 and (not in_word or bool(is_eos))))
+            states[parent + (token_id,)] = (words, in_word)
+        self.states = states
+        return torch.tensor(done, dtype=torch.bool, device=input_ids.device)
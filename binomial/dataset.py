@@ -0,0 +1,306 @@
+import os
+import json
+import shutil
+import hashlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import torch
+from torch.utils.data import Dataset, Sampler
+from .constraint import tokenizer_fingerprint
+from .species_table import PROMPT_COLUMNS, ParquetTableWriter, iter_species
+
+CACHE_VERSION = 4
+TOKENIZE_BATCH = 1024
+CSV_CHUNK_SIZE = 100_000
+ARRAYS = ["input_ids", "offsets", "prompt_len", "label_mask", "names", "name_offsets"]
+COPY_BLOCK = 1 << 24
+EXAMPLE_COLUMNS = ["description", "family", "genus", "epithet"]
+
+
+def build_examples(df):
+    """prompt / target rows for every usable row of a species dataframe, vectorized.
+
+    The name comes from canonicalName, else scientificName; rows without a
+    two-word name or a description are dropped.
+    """
+    name = df["canonicalName"] if "canonicalName" in df.columns else pd.Series(None, index=df.index, dtype=object)
+    if "scientificName" in df.columns:
+        name = name.astype(object).where(name.notna(), df["scientificName"].astype(object))
+    parts = name.astype(object).fillna("").astype(str).str.split()
+    description = df["description"].astype(object) if "description" in df.columns else pd.Series("", index=df.index)
+    family = df["family"].astype(object) if "family" in df.columns else pd.Series("", index=df.index)
+    keep = (parts.str.len() >= 2) & description.notna() & (description.astype(str) != "")
+    parts = parts[keep]
+    examples = pd.DataFrame({
+        "description": description[keep].astype(str).str.strip(),
+        "family": family[keep].fillna("").astype(str).str.strip(),
+        "genus": parts.str[0],
+        "epithet": parts.str[1],
+    }).reset_index(drop=True)
+    examples["prompt"] = "Description: " + examples["description"] + "\nFamily: " + examples["family"] + "\nName:"
+    examples["target"] = " " + examples["genus"] + " " + examples["epithet"]
+    return examples
+
+
+def file_sha1(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def cache_key(csv_path, tokenizer, max_length):
+    h = hashlib.sha1()
+    h.update(f"{CACHE_VERSION}:{max_length}:{file_sha1(csv_path)}:".encode())
+    h.update(tokenizer_fingerprint(tokenizer).encode())
+    return h.hexdigest()[:16]
+
+
+def tokenize_examples(examples, tokenizer, max_length):
+    """Bulk-tokenize prompt + target pairs with the fast tokenizer's batch mode.
+
+    Rows are stored unpadded, concatenated into one flat array with offsets,
+    so padding is decided per batch by the collator.
+    """
+    prompts = examples["prompt"].tolist()
+    texts = (examples["prompt"] + examples["target"]).tolist()
+    input_ids = []
+    prompt_len = []
+    for start in range(0, len(prompts), TOKENIZE_BATCH):
+        enc = tokenizer(texts[start:start + TOKENIZE_BATCH], truncation=True, max_length=max_length)
+        enc_prompt = tokenizer(prompts[start:start + TOKENIZE_BATCH], truncation=True, max_length=max_length)
+        input_ids.extend(enc["input_ids"])
+        prompt_len.extend(len(ids) for ids in enc_prompt["input_ids"])
+    lengths = np.array([len(ids) for ids in input_ids], dtype=np.int64)
+    offsets = np.zeros(len(input_ids) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    prompt_len = np.array(prompt_len, dtype=np.int32)
+    flat = np.fromiter((t for ids in input_ids for t in ids), dtype=np.int32, count=int(offsets[-1]))
+    positions = np.arange(len(flat)) - np.repeat(offsets[:-1], lengths)
+    label_mask = positions >= np.repeat(prompt_len, lengths)
+    return {"input_ids": flat, "offsets": offsets, "prompt_len": prompt_len, "label_mask": label_mask}
+
+
+def _raw_to_npy(raw_path, npy_path, dtype):
+    """Copy a raw binary file into a .npy file block by block, without loading it whole"""
+    count = os.path.getsize(raw_path) // np.dtype(dtype).itemsize
+    out = np.lib.format.open_memmap(npy_path, mode="w+", dtype=dtype, shape=(count,))
+    if count:
+        raw = np.memmap(raw_path, dtype=dtype, mode="r")
+        for start in range(0, count, COPY_BLOCK):
+            out[start:start + COPY_BLOCK] = raw[start:start + COPY_BLOCK]
+        del raw
+    out.flush()
+    del out
+    os.remove(raw_path)
+
+
+def prepare_chunk(df, tokenizer, max_length):
+    """Examples and token arrays for one table chunk; offsets are relative to the chunk"""
+    examples = build_examples(df)
+    arrays = tokenize_examples(examples, tokenizer, max_length)
+    names = (examples["genus"] + " " + examples["epithet"]).str.encode("utf-8")
+    arrays["names"] = np.frombuffer(b"".join(names), dtype=np.uint8)
+    arrays["name_offsets"] = np.cumsum(names.str.len().to_numpy(dtype=np.int64))
+    arrays["offsets"] = arrays["offsets"][1:]
+    return examples[EXAMPLE_COLUMNS], arrays
+
+
+_worker_args = None
+
+
+def _init_worker(tokenizer, max_length):
+    global _worker_args
+    _worker_args = (tokenizer, max_length)
+
+
+def _prepare_in_worker(df):
+    return prepare_chunk(df, *_worker_args)
+
+
+def prepared_chunks(chunks, tokenizer, max_length, workers=0):
+    """prepare_chunk over an iterable of dataframes, in order.
+
+    With workers > 1 the chunks are spread over a process pool; at most
+    2 * workers chunks are in flight, so memory stays bounded.
+    """
+    if workers <= 1:
+        for df in chunks:
+            yield prepare_chunk(df, tokenizer, max_length)
+        return
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(tokenizer, max_length)) as pool:
+        pending = deque()
+        for df in chunks:
+            pending.append(pool.submit(_prepare_in_worker, df))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def build_token_cache(chunks, tokenizer, cache_dir, max_length, workers=0):
+    """Build examples from dataframe chunks and tokenize them into a cache directory.
+
+    Each chunk's arrays are appended to raw files as soon as it is
+    prepared, so memory is bounded by the chunk size. genus / epithet
+    are stored the same way as the tokens: utf-8 bytes of "genus epithet"
+    in one flat array with offsets. The examples themselves go to
+    examples.parquet, row-aligned with the arrays.
+    """
+    tmp_dir = cache_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    dtypes = {"input_ids": np.int32, "offsets": np.int64, "prompt_len": np.int32, "label_mask": np.bool_,
+              "names": np.uint8, "name_offsets": np.int64}
+    files = {name: open(os.path.join(tmp_dir, f"{name}.bin"), "wb") for name in ARRAYS}
+    rows = tokens = name_bytes = 0
+    np.zeros(1, dtype=np.int64).tofile(files["offsets"])
+    np.zeros(1, dtype=np.int64).tofile(files["name_offsets"])
+    try:
+        with ParquetTableWriter(os.path.join(tmp_dir, "examples.parquet")) as table:
+            for examples, arrays in prepared_chunks(chunks, tokenizer, max_length, workers):
+                if not len(examples):
+                    continue
+                arrays["offsets"] += tokens
+                arrays["name_offsets"] += name_bytes
+                for name in ARRAYS:
+                    arrays[name].astype(dtypes[name], copy=False).tofile(files[name])
+                table.write(examples)
+                rows += len(examples)
+                tokens = int(arrays["offsets"][-1])
+                name_bytes = int(arrays["name_offsets"][-1])
+            if table.writer is None:
+                table.write(pd.DataFrame(columns=EXAMPLE_COLUMNS))
+    finally:
+        for f in files.values():
+            f.close()
+    for name in ARRAYS:
+        _raw_to_npy(os.path.join(tmp_dir, f"{name}.bin"), os.path.join(tmp_dir, f"{name}.npy"), dtypes[name])
+    with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"version": CACHE_VERSION, "rows": rows, "max_length": max_length}, f)
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.replace(tmp_dir, cache_dir)
+
+
+def load_or_build_token_cache(tokenizer, csv_path, cache_root, max_length, chunksize=CSV_CHUNK_SIZE, workers=0):
+    """Return the cache directory for this table + tokenizer, streaming the table in only on a miss.
+
+    Only the columns the prompt needs are loaded.
+    """
+    cache_dir = os.path.join(cache_root, cache_key(csv_path, tokenizer, max_length))
+    if not os.path.exists(os.path.join(cache_dir, "meta.json")):
+        os.makedirs(cache_root, exist_ok=True)
+        chunks = iter_species(csv_path, PROMPT_COLUMNS, chunksize)
+        build_token_cache(chunks, tokenizer, cache_dir, max_length, workers)
+    return cache_dir
+
+
+# Dataset
+class BinomialDataset(Dataset):
+    """Rows of a token cache, memory-mapped lazily so DataLoader workers share pages"""
+
+    def __init__(self, cache_dir, indices=None):
+        self.cache_dir = cache_dir
+        with open(os.path.join(cache_dir, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.indices = np.arange(meta["rows"]) if indices is None else np.asarray(indices)
+        self._arrays = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_arrays"] = None
+        return state
+
+    @property
+    def arrays(self):
+        if self._arrays is None:
+            self._arrays = {name: np.load(os.path.join(self.cache_dir, f"{name}.npy"), mmap_mode="r")
+                            for name in ARRAYS}
+        return self._arrays
+
+    @property
+    def lengths(self):
+        offsets = np.asarray(self.arrays["offsets"])
+        return (offsets[self.indices + 1] - offsets[self.indices]).astype(np.int64)
+
+    def binomial(self, row):
+        """(genus, epithet) of a cache row"""
+        arrays = self.arrays
+        start, end = int(arrays["name_offsets"][row]), int(arrays["name_offsets"][row + 1])
+        genus, _, epithet = bytes(arrays["names"][start:end]).decode("utf-8").partition(" ")
+        return genus, epithet
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, idx):
+        row = int(self.indices[idx])
+        arrays = self.arrays
+        start, end = int(arrays["offsets"][row]), int(arrays["offsets"][row + 1])
+        input_ids = torch.from_numpy(arrays["input_ids"][start:end].astype(np.int64))
+        attention_mask = torch.ones_like(input_ids)
+        label_mask = torch.from_numpy(np.array(arrays["label_mask"][start:end]))
+        labels = input_ids.masked_fill(~label_mask, -100)
+        genus, epithet = self.binomial(row)
+
+        return {"input_ids": input_ids, "attention_mask": attention_mask, "labels": labels,
+                "genus": genus, "epithet": epithet}
+
+
+class BinomialCollator:
+    """Right-pads a batch to its longest row; padding never contributes to the loss"""
+
+    def __init__(self, pad_token_id, pad_to_multiple_of=None):
+        self.pad_token_id = pad_token_id
+        self.pad_to_multiple_of = pad_to_multiple_of
+
+    def __call__(self, features):
+        max_len = max(len(f["input_ids"]) for f in features)
+        if self.pad_to_multiple_of:
+            max_len = -(-max_len // self.pad_to_multiple_of) * self.pad_to_multiple_of
+        n = len(features)
+        input_ids = torch.full((n, max_len), self.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((n, max_len), dtype=torch.long)
+        labels = torch.full((n, max_len), -100, dtype=torch.long)
+        for i, f in enumerate(features):
+            length = len(f["input_ids"])
+            input_ids[i, :length] = f["input_ids"]
+            attention_mask[i, :length] = f["attention_mask"]
+            labels[i, :length] = f["labels"]
+        return {"input_ids": input_ids, "attention_mask": attention_mask, "labels": labels}
+
+
+class LengthBucketSampler(Sampler):
+    """Shuffled order in which every run of batch_size indices has similar lengths.
+
+    Indices are shuffled, sorted by length inside buckets of
+    bucket_batches * batch_size, cut into batches, and the full batches
+    are shuffled again so consecutive steps do not grow monotonically.
+    """
+
+    def __init__(self, lengths, batch_size, bucket_batches=50, seed=0):
+        self.lengths = np.asarray(lengths)
+        self.batch_size = batch_size
+        self.bucket_size = batch_size * bucket_batches
+        self.seed = seed
+        self.epoch = 0
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def __iter__(self):
+        rng = np.random.default_rng(self.seed + self.epoch)
+        self.epoch += 1
+        perm = rng.permutation(len(self.lengths))
+        for start in range(0, len(perm), self.bucket_size):
+            bucket = perm[start:start + self.bucket_size]
+            perm[start:start + self.bucket_size] = bucket[np.argsort(self.lengths[bucket], kind="stable")]
+        batches = [perm[i:i + self.batch_size] for i in range(0, len(perm), self.batch_size)]
+        tail = batches.pop() if batches and len(batches[-1]) < self.batch_size else None
+        order = [batches[i] for i in rng.permutation(len(batches))]
+        if tail is not None:
+            order.append(tail)
+        return iter(int(i) for batch in order for i in batch)
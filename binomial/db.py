@@ -0,0 +1,9 @@
+import sqlite3
+
+
+def connect(path, **kwargs):
+    """SQLite connection in WAL mode; kwargs go to sqlite3.connect"""
+    conn = sqlite3.connect(path, **kwargs)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
@@ -0,0 +1,84 @@
+import time
+from .generation import (MODEL_DIR, format_prompt, generate_binomials, generate_binomials_cached,
+                         load_model, loaded_fingerprint)
+from .prepare import prepare, load_examples
+
+BATCH_SIZE = 8
+NUM_BEAMS = 5
+TABLE_PATH = "data/species_with_description_fixed.csv"
+VAL_SAMPLES = 200   # held-out rows of the prepared split to score; 0 skips
+
+EXAMPLES = [
+    ("a large brown bear with a scar on its paw", "Ursidae"),
+    ("a tiny gray mouse living in a barn", "Muridae"),
+    ("a colorful parrot that can imitate human speech", "Psittacidae"),
+    ("a dark green frog that lives near waterfalls", "Ranidae"),
+    ("a fast-running desert fox", "Canidae"),
+    ("a golden-scaled fish often seen in garden ponds", "Cyprinidae"),
+    ("a fluffy black rabbit with long ears", "Leporidae"),
+    ("a snow owl known for silent flight", "Strigidae"),
+    ("a gentle giant elephant with long tusks", "Elephantidae"),
+    ("a red-striped tiger wandering in bamboo forests", "Felidae"),
+    ("a shy hedgehog that curls into a ball", "Erinaceidae"),
+    ("a sleek black panther that hunts at night", "Felidae"),
+    ("a curious dolphin that plays with seaweed", "Delphinidae"),
+    ("a slow-moving turtle with a patterned shell", "Testudinidae"),
+    ("a bright green lizard sunbathing on warm rocks", "Lacertidae")
+]
+
+
+def evaluate(model_dir=MODEL_DIR, examples=EXAMPLES, val_samples=VAL_SAMPLES, table_path=TABLE_PATH,
+             batch_size=BATCH_SIZE, num_beams=NUM_BEAMS, cache=None):
+    """Print generations for `examples` and score held-out rows; returns the metrics.
+
+    With a ResultCache, prompts generated before (by earlier runs or the server) skip the model.
+    """
+    model, tokenizer, token_index = load_model(model_dir)
+    generate_fn = generate_binomials
+    if cache is not None:
+        fingerprint = loaded_fingerprint(model_dir)
+
+        def generate_fn(*args, **kwargs):
+            return generate_binomials_cached(*args[:4], cache, fingerprint, *args[4:], **kwargs)
+
+    start = time.perf_counter()
+    step_times = []
+    generated_tokens = []
+    names = generate_fn(model, tokenizer, token_index, examples, batch_size=batch_size,
+                        num_beams=num_beams, step_times=step_times, generated_tokens=generated_tokens)
+    elapsed = time.perf_counter() - start
+
+    for (description, family), sci in zip(examples, names):
+        print("----------------------------------------")
+        print("Prompt:\n", format_prompt(description, family))
+        print("Generated scientific name:\n", sci)
+
+    metrics = {
+        "names_per_sec": len(names) / elapsed if elapsed else 0.0,
+        "ms_per_name": 1000 * elapsed / max(len(names), 1),
+        "tokens_per_name": sum(generated_tokens) / max(len(generated_tokens), 1),
+        "constraint_ms_per_step": 1000 * sum(step_times) / max(len(step_times), 1),
+    }
+    print("----------------------------------------")
+    print(f"Throughput: {metrics['names_per_sec']:.2f} names/sec (batch_size={batch_size}, num_beams={num_beams})")
+    print(f"Generated: {metrics['tokens_per_name']:.1f} tokens/name, {metrics['ms_per_name']:.1f} ms/name")
+    print(f"Constraint latency: {metrics['constraint_ms_per_step']:.3f} ms/step over {len(step_times)} steps")
+
+    # Held-out rows of the same prepared split the model was trained with
+    if val_samples:
+        cache_dir, _, val_idx = prepare(tokenizer, table_path)
+        held_out = load_examples(cache_dir, val_idx[:val_samples])
+        pairs = list(zip(held_out["description"], held_out["family"].astype(str)))
+        predicted = generate_fn(model, tokenizer, token_index, pairs, batch_size=batch_size,
+                                num_beams=num_beams)
+        truth = (held_out["genus"].astype(str) + " " + held_out["epithet"]).tolist()
+        n = max(len(truth), 1)
+        metrics["held_out_rows"] = len(truth)
+        metrics["exact"] = sum(p == t for p, t in zip(predicted, truth)) / n
+        metrics["genus"] = sum(p.split()[:1] == t.split()[:1] for p, t in zip(predicted, truth)) / n
+        print(f"Held-out ({len(truth)} rows): exact binomial {metrics['exact']:.1%}, "
+              f"genus {metrics['genus']:.1%}")
+    if cache is not None:
+        metrics["cache"] = cache.stats()
+        print(f"Result cache: {metrics['cache']}")
+    return metrics
@@ -0,0 +1,173 @@
+import threading
+from .constraint import BinomialStoppingCriteria, LatinEpithetLogitsProcessor, load_token_index
+from .result_cache import model_fingerprint, result_key
+
+MODEL_DIR = "./gpt2-finetuned-binomial"
+MAX_NEW_TOKENS = 35
+
+_models = {}
+_fingerprints = {}
+_models_lock = threading.Lock()
+
+
+def format_prompt(description, family):
+    return f"Description: {description.strip()}\nFamily: {family.strip()}\nName:"
+
+
+def extract_binomial(text):
+    """First two words after the last "Name:" """
+    sci = text.split("Name:")[-1].strip()
+    return " ".join(sci.split()[:2])
+
+
+def sequence_scores(model, out, prompt_len, eos_token_id, num_beams):
+    """Mean log-probability per generated token of each returned sequence"""
+    import torch
+    if num_beams > 1:
+        # beam search already length-normalizes (length_penalty=1.0)
+        return out.sequences_scores.tolist()
+    transition = model.compute_transition_scores(out.sequences, out.scores, normalize_logits=True)
+    is_eos = out.sequences[:, prompt_len:] == eos_token_id
+    keep = (is_eos.cumsum(-1) - is_eos.long()) == 0   # up to and including the first eos
+    transition = transition.masked_fill(~keep | ~torch.isfinite(transition), 0.0)
+    return (transition.sum(-1) / keep.sum(-1).clamp(min=1)).tolist()
+
+
+def generated_lengths(sequences, prompt_len, eos_token_id):
+    """New tokens per row, up to and including the first eos"""
+    generated = sequences[:, prompt_len:]
+    is_eos = generated == eos_token_id
+    first_eos = is_eos.int().argmax(-1) + 1
+    return first_eos.where(is_eos.any(-1), generated.shape[1]).tolist()
+
+
+def generate_binomials(model, tokenizer, token_index, pairs, batch_size=8, num_beams=5,
+                       max_new_tokens=MAX_NEW_TOKENS, step_times=None, generated_tokens=None,
+                       return_scores=False):
+    """Generate one binomial per (description, family) pair, returned in input order.
+
+    Prompts are sorted by token length so each left-padded batch carries as
+    little padding as possible, and the Latin constraint runs per row. Rows
+    stop as soon as their binomial is complete, and each batch as soon as
+    all of its rows are. With return_scores every result is a (binomial,
+    score) pair, score being the mean log-probability per generated token.
+    generated_tokens, if given, is extended with the number of new tokens
+    behind each result, in input order.
+    """
+    import torch
+    from transformers import LogitsProcessorList, StoppingCriteriaList
+    prompts = [format_prompt(d, f) for d, f in pairs]
+    if not prompts:
+        return []
+    lengths = [len(ids) for ids in tokenizer(prompts)["input_ids"]]
+    order = sorted(range(len(prompts)), key=lambda i: lengths[i])
+    results = [None] * len(prompts)
+    new_tokens = [0] * len(prompts)
+
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    padding_side = tokenizer.padding_side
+    tokenizer.padding_side = "left"
+    try:
+        for start in range(0, len(order), batch_size):
+            idx = order[start:start + batch_size]
+            enc = tokenizer([prompts[i] for i in idx], return_tensors="pt", padding=True).to(model.device)
+            latin_processor = LatinEpithetLogitsProcessor(tokenizer, token_index, num_beams=num_beams)
+            with torch.no_grad():
+                out = model.generate(
+                    **enc,
+                    max_new_tokens=max_new_tokens,
+                    num_beams=num_beams,
+                    do_sample=False,
+                    pad_token_id=tokenizer.pad_token_id,
+                    logits_processor=LogitsProcessorList([latin_processor]),
+                    stopping_criteria=StoppingCriteriaList([BinomialStoppingCriteria(tokenizer, token_index)]),
+                    return_dict_in_generate=return_scores,
+                    output_scores=return_scores,
+                )
+            if step_times is not None:
+                step_times.extend(latin_processor.step_times)
+            sequences = out.sequences if return_scores else out
+            texts = tokenizer.batch_decode(sequences, skip_special_tokens=True)
+            prompt_len = enc["input_ids"].shape[1]
+            for i, n in zip(idx, generated_lengths(sequences, prompt_len, tokenizer.eos_token_id)):
+                new_tokens[i] = n
+            if return_scores:
+                scores = sequence_scores(model, out, prompt_len, tokenizer.eos_token_id, num_beams)
+                for i, text, score in zip(idx, texts, scores):
+                    results[i] = (extract_binomial(text), score)
+            else:
+                for i, text in zip(idx, texts):
+                    results[i] = extract_binomial(text)
+    finally:
+        tokenizer.padding_side = padding_side
+    if generated_tokens is not None:
+        generated_tokens.extend(new_tokens)
+    return results
+
+
+def result_keys(pairs, fingerprint, num_beams=5, max_new_tokens=MAX_NEW_TOKENS):
+    """ResultCache keys: the exact prompt, the decoding settings and the model fingerprint"""
+    params = {"num_beams": num_beams, "max_new_tokens": max_new_tokens}
+    return [result_key(format_prompt(d, f), params, fingerprint) for d, f in pairs]
+
+
+def generate_binomials_cached(model, tokenizer, token_index, pairs, cache, fingerprint, batch_size=8,
+                              num_beams=5, max_new_tokens=MAX_NEW_TOKENS, step_times=None, generated_tokens=None,
+                              return_scores=False):
+    """generate_binomials that only runs the model for prompts missing from a ResultCache.
+
+    Decoding is deterministic (beam search, no sampling), so a cached
+    (binomial, score) is exactly what the model would return again.
+    """
+    keys = result_keys(pairs, fingerprint, num_beams, max_new_tokens)
+    results = [cache.get(key) for key in keys]
+    todo = {}
+    for i, result in enumerate(results):
+        if result is None:
+            todo.setdefault(keys[i], pairs[i])
+    if todo:
+        generated = generate_binomials(model, tokenizer, token_index, list(todo.values()), batch_size=batch_size,
+                                       num_beams=num_beams, max_new_tokens=max_new_tokens,
+                                       step_times=step_times, generated_tokens=generated_tokens,
+                                       return_scores=True)
+        new = dict(zip(todo, generated))
+        cache.put_many(list(new.items()))
+        results = [new[key] if result is None else result for key, result in zip(keys, results)]
+    results = [tuple(result) for result in results]
+    return results if return_scores else [name for name, _ in results]
+
+
+def load_model(model_dir=MODEL_DIR, device=None):
+    """(model, tokenizer, token_index) for model_dir, loaded on first use and then shared"""
+    key = (model_dir, device)
+    with _models_lock:
+        if key not in _models:
+            import torch
+            from transformers import GPT2TokenizerFast, GPT2LMHeadModel
+            device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+            tokenizer = GPT2TokenizerFast.from_pretrained(model_dir)
+            model = GPT2LMHeadModel.from_pretrained(model_dir).to(device)
+            model.eval()
+            _models[key] = (model, tokenizer, load_token_index(tokenizer, model_dir))
+            _fingerprints[key] = model_fingerprint(model_dir, tokenizer)
+        return _models[key]
+
+
+def loaded_fingerprint(model_dir=MODEL_DIR, device=None):
+    """model_fingerprint of the model load_model returns for these arguments"""
+    load_model(model_dir, device)
+    return _fingerprints[(model_dir, device)]
+
+
+def generate(pairs, model_dir=MODEL_DIR, batch_size=8, num_beams=5, cache=None, **kwargs):
+    """Binomials for (description, family) pairs with the fine-tuned model in model_dir.
+
+    With a ResultCache, prompts generated before are answered without running the model.
+    """
+    model, tokenizer, token_index = load_model(model_dir)
+    if cache is not None:
+        return generate_binomials_cached(model, tokenizer, token_index, pairs, cache, loaded_fingerprint(model_dir),
+                                         batch_size=batch_size, num_beams=num_beams, **kwargs)
+    return generate_binomials(model, tokenizer, token_index, pairs, batch_size=batch_size,
+                              num_beams=num_beams, **kwargs)
@@ -0,0 +1,79 @@
+"""Data preparation stage: species table -> tokenized training rows + train/val split.
+
+The prepared artifact is a token-cache directory (see binomial.dataset)
+keyed by the table contents, tokenizer and MAX_LENGTH, plus a stored
+split file per (val_size, seed). Training, evaluation and the benchmarks
+all load the same artifact; it is only built when missing.
+
+    python -m binomial.prepare [TABLE] [MODEL_NAME] [WORKERS]
+"""
+import os
+import sys
+import json
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from .dataset import BinomialDataset, load_or_build_token_cache
+
+# settings
+TABLE_PATH = "data/species_with_description_fixed.csv"   # or the .parquet next to it
+MODEL_NAME = "gpt2"
+TOKEN_CACHE_DIR = "data/token_cache"
+MAX_LENGTH = 64
+VAL_SIZE = 0.05
+SEED = 42
+CHUNK_SIZE = 100_000
+WORKERS = min(8, os.cpu_count() or 1)
+
+
+def split_path(cache_dir, val_size=VAL_SIZE, seed=SEED):
+    return os.path.join(cache_dir, f"split-{val_size}-{seed}.npz")
+
+
+def load_or_build_split(cache_dir, val_size=VAL_SIZE, seed=SEED):
+    """(train_idx, val_idx) over the rows of a token cache, computed once and stored beside it"""
+    path = split_path(cache_dir, val_size, seed)
+    if not os.path.exists(path):
+        with open(os.path.join(cache_dir, "meta.json"), "r", encoding="utf-8") as f:
+            rows = json.load(f)["rows"]
+        train_idx, val_idx = train_test_split(np.arange(rows), test_size=val_size, random_state=seed)
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, train=train_idx, val=val_idx)
+        os.replace(tmp, path)
+    split = np.load(path)
+    return split["train"], split["val"]
+
+
+def prepare(tokenizer, table_path=TABLE_PATH, cache_root=TOKEN_CACHE_DIR, max_length=MAX_LENGTH,
+            val_size=VAL_SIZE, seed=SEED, chunksize=CHUNK_SIZE, workers=0):
+    """Return (cache_dir, train_idx, val_idx), building whatever is missing"""
+    cache_dir = load_or_build_token_cache(tokenizer, table_path, cache_root, max_length, chunksize, workers)
+    train_idx, val_idx = load_or_build_split(cache_dir, val_size, seed)
+    return cache_dir, train_idx, val_idx
+
+
+def load_datasets(tokenizer, **kwargs):
+    """(train_dataset, val_dataset) over the prepared artifact"""
+    cache_dir, train_idx, val_idx = prepare(tokenizer, **kwargs)
+    return BinomialDataset(cache_dir, train_idx), BinomialDataset(cache_dir, val_idx)
+
+
+def load_examples(cache_dir, indices=None):
+    """description / family / genus / epithet of the prepared rows, optionally a subset"""
+    examples = pd.read_parquet(os.path.join(cache_dir, "examples.parquet"))
+    return examples if indices is None else examples.iloc[np.asarray(indices)].reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    import time
+    from transformers import GPT2TokenizerFast
+
+    table_path = sys.argv[1] if len(sys.argv) > 1 else TABLE_PATH
+    model_name = sys.argv[2] if len(sys.argv) > 2 else MODEL_NAME
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else WORKERS
+    tokenizer = GPT2TokenizerFast.from_pretrained(model_name)
+
+    start = time.perf_counter()
+    cache_dir, train_idx, val_idx = prepare(tokenizer, table_path, workers=workers)
+    print(f"{cache_dir}: {len(train_idx)} train / {len(val_idx)} val rows "
+          f"({time.perf_counter() - start:.1f}s, {workers} workers)")
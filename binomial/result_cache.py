@@ -0,0 +1,104 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from .constraint import tokenizer_fingerprint
+from .db import connect
+
+CAPACITY = 10_000
+WEIGHT_SUFFIXES = (".safetensors", ".bin", ".pt")
+
+
+def model_fingerprint(model_dir, tokenizer):
+    """Hash of the tokenizer, config and weight files (name, size, mtime) of a saved model"""
+    h = hashlib.sha1(tokenizer_fingerprint(tokenizer).encode())
+    config = os.path.join(model_dir, "config.json")
+    if os.path.exists(config):
+        with open(config, "rb") as f:
+            h.update(f.read())
+    for name in sorted(os.listdir(model_dir)):
+        if name.endswith(WEIGHT_SUFFIXES):
+            st = os.stat(os.path.join(model_dir, name))
+            h.update(f"{name}:{st.st_size}:{st.st_mtime_ns}".encode())
+    return h.hexdigest()[:16]
+
+
+def result_key(prompt, params, fingerprint):
+    """Cache key of one prompt; params are the decoding settings that change the output"""
+    key = json.dumps([fingerprint, sorted(params.items()), prompt], ensure_ascii=False)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Generation results keyed by result_key: an in-memory LRU plus an optional SQLite tier.
+
+    Memory misses fall through to disk and are promoted on a hit; every
+    put goes to both. Safe to share between threads.
+    """
+
+    def __init__(self, capacity=CAPACITY, path=None):
+        self.capacity = capacity
+        self.memory = OrderedDict()
+        self.conn = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self.conn = connect(path, check_same_thread=False)
+            self.conn.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT)")
+            self.conn.commit()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def _remember(self, key, value):
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.capacity:
+            self.memory.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key):
+        with self._lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.hits += 1
+                return self.memory[key]
+            if self.conn is not None:
+                row = self.conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._remember(key, value)
+                    self.disk_hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def put_many(self, items):
+        with self._lock:
+            for key, value in items:
+                self._remember(key, value)
+            if self.conn is not None:
+                self.conn.executemany("INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)",
+                                      [(key, json.dumps(value, ensure_ascii=False)) for key, value in items])
+                self.conn.commit()
+
+    def put(self, key, value):
+        self.put_many([(key, value)])
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "size": len(self.memory),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
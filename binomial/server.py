@@ -0,0 +1,263 @@
+"""Local inference server that keeps the fine-tuned model warm.
+
+Concurrent requests are queued and a single worker thread coalesces them
+into micro-batches: it takes the first waiting item, then keeps collecting
+until MAX_BATCH items are gathered or MAX_WAIT_MS has passed, and runs
+them through one generate_binomials call.
+
+    python -m binomial.server [MODEL_DIR] [PORT]
+
+    POST /generate  {"description": ..., "family": ...}
+                    or {"items": [{"description": ..., "family": ...}, ...]}
+                 -> {"results": [{"binomial": ..., "score": ...}, ...]}
+                    400 {"error": ...} unless every description is a non-empty string
+    GET  /metrics   request / batch counts, p50 / p99 latency, queue depth,
+                    result-cache hit rate
+    GET  /health
+
+Prompts already in the ResultCache are answered by the handler directly
+and never reach the queue.
+"""
+import sys
+import json
+import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from .generation import MODEL_DIR, generate_binomials, load_model, loaded_fingerprint, result_keys
+from .result_cache import CAPACITY, ResultCache
+
+# settings
+HOST = "127.0.0.1"
+PORT = 8765
+MAX_BATCH = 16
+MAX_WAIT_MS = 10
+NUM_BEAMS = 5
+LATENCY_WINDOW = 10_000   # most recent requests kept for the percentiles
+RESULT_CACHE_SIZE = CAPACITY   # 0 disables the result cache
+RESULT_CACHE_PATH = None       # e.g. "data/result_cache.sqlite" to keep results across restarts
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+class MicroBatcher:
+    """Runs generate_fn(pairs) -> results on batches of individually submitted pairs"""
+
+    def __init__(self, generate_fn, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+        self.generate_fn = generate_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.queue = queue.Queue()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self.max_queue_depth = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, pair):
+        future = Future()
+        self.queue.put((pair, future, time.perf_counter()))
+        with self._lock:
+            self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+        return future
+
+    def close(self):
+        self.queue.put(None)
+        self._thread.join()
+
+    def _collect(self):
+        first = self.queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is None:
+                self.queue.put(None)   # finish this batch, stop on the next collect
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            try:
+                results = self.generate_fn([pair for pair, _, _ in batch])
+            except Exception as e:
+                with self._lock:
+                    self.errors += len(batch)
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            done = time.perf_counter()
+            with self._lock:
+                self.batches += 1
+                self.requests += len(batch)
+                self.latencies.extend(done - submitted for _, _, submitted in batch)
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+
+    def metrics(self):
+        with self._lock:
+            latencies = list(self.latencies)
+            return {
+                "requests": self.requests,
+                "batches": self.batches,
+                "errors": self.errors,
+                "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+                "latency_p50_ms": 1000 * percentile(latencies, 50),
+                "latency_p99_ms": 1000 * percentile(latencies, 99),
+                "queue_depth": self.queue.qsize(),
+                "max_queue_depth": self.max_queue_depth,
+            }
+
+
+def parse_pairs(body):
+    """(description, family) pairs of a /generate body; ValueError with a client-facing message"""
+    if not isinstance(body, dict):
+        raise ValueError("body must be a JSON object")
+    items = body["items"] if "items" in body else [body]
+    if not isinstance(items, list) or not items:
+        raise ValueError("'items' must be a non-empty list")
+    pairs = []
+    for i, item in enumerate(items):
+        where = f"items[{i}]" if "items" in body else "body"
+        if not isinstance(item, dict):
+            raise ValueError(f"{where} must be an object")
+        description, family = item.get("description"), item.get("family", "")
+        if not isinstance(description, str) or not description.strip():
+            raise ValueError(f"{where}: 'description' must be a non-empty string")
+        if not isinstance(family, str):
+            raise ValueError(f"{where}: 'family' must be a string")
+        pairs.append((description, family))
+    return pairs
+
+
+def model_generate_fn(model_dir=MODEL_DIR, num_beams=NUM_BEAMS):
+    model, tokenizer, token_index = load_model(model_dir)
+
+    def generate_fn(pairs):
+        return generate_binomials(model, tokenizer, token_index, pairs, batch_size=len(pairs),
+                                  num_beams=num_beams, return_scores=True)
+
+    return generate_fn
+
+
+def make_handler(batcher, cache=None, fingerprint=None, num_beams=NUM_BEAMS):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status, body):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/metrics":
+                metrics = batcher.metrics()
+                if cache is not None:
+                    metrics["cache"] = cache.stats()
+                self._send(200, metrics)
+            elif self.path == "/health":
+                self._send(200, {"status": "ok"})
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/generate":
+                self._send(404, {"error": "not found"})
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            except ValueError:
+                self._send(400, {"error": "bad request: body is not valid JSON"})
+                return
+            try:
+                pairs = parse_pairs(body)
+            except ValueError as e:
+                self._send(400, {"error": f"bad request: {e}"})
+                return
+            keys = result_keys(pairs, fingerprint, num_beams) if cache is not None else None
+            cached = [cache.get(key) for key in keys] if cache is not None else [None] * len(pairs)
+            futures = [batcher.submit(pair) if hit is None else None for pair, hit in zip(pairs, cached)]
+            try:
+                results = [hit if future is None else future.result() for hit, future in zip(cached, futures)]
+            except Exception as e:
+                self._send(500, {"error": str(e)})
+                return
+            if cache is not None:
+                cache.put_many([(key, list(result)) for key, result, hit in zip(keys, results, cached) if hit is None])
+            self._send(200, {"results": [{"binomial": name, "score": score} for name, score in results]})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class InferenceServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128   # the default backlog of 5 resets bursts of concurrent clients
+
+    def __init__(self, address, batcher, cache=None, fingerprint=None):
+        super().__init__(address, make_handler(batcher, cache, fingerprint))
+        self.batcher = batcher
+        self.cache = cache
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+        self.batcher.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+def serve(model_dir=MODEL_DIR, host=HOST, port=PORT, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS,
+          generate_fn=None, cache_size=RESULT_CACHE_SIZE, cache_path=RESULT_CACHE_PATH, fingerprint=None):
+    """Start the server in the background and return it; port 0 picks a free port. Stop it with close().
+
+    A custom generate_fn needs its own fingerprint for the result cache.
+    """
+    batcher = MicroBatcher(generate_fn or model_generate_fn(model_dir), max_batch, max_wait_ms)
+    cache = None
+    if cache_size:
+        cache = ResultCache(cache_size, cache_path)
+        fingerprint = fingerprint or loaded_fingerprint(model_dir)
+    server = InferenceServer((host, port), batcher, cache, fingerprint)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    model_dir = sys.argv[1] if len(sys.argv) > 1 else MODEL_DIR
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else PORT
+    server = serve(model_dir, port=port)
+    print(f"Serving {model_dir} on http://{HOST}:{server.server_address[1]} "
+          f"(max_batch={MAX_BATCH}, max_wait={MAX_WAIT_MS} ms)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.close()
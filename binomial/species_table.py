@@ -0,0 +1,144 @@
+"""Read and write the species tables in data/ as CSV or Parquet.
+
+Parquet files are typed: every column is a string except family and genus,
+which are dictionary-encoded (pandas category) since a few hundred values
+repeat across millions of rows. Paths ending in .parquet are read with
+pyarrow and support column projection; anything else is read as CSV.
+
+    python -m binomial.species_table [CSV ...]   converts the CSVs (default: the data/ tables)
+
+The data/*.parquet tables are build outputs and are not committed; run the
+command above to regenerate them next to the CSVs.
+"""
+import os
+import sys
+import pandas as pd
+
+CHUNK_SIZE = 100_000
+DICTIONARY_COLUMNS = ["family", "genus"]
+PROMPT_COLUMNS = ["canonicalName", "scientificName", "family", "epithet", "description"]
+DATA_TABLES = {
+    "data/species_list.csv": "utf-8-sig",
+    "data/species_with_description.csv": "gb18030",   # saved by Excel on a Chinese-locale system
+    "data/species_with_description_fixed.csv": "utf-8-sig",
+}
+
+
+def parquet_path(path):
+    return os.path.splitext(path)[0] + ".parquet"
+
+
+def is_parquet(path):
+    return path.endswith(".parquet")
+
+
+def with_genus(df):
+    """Add the genus column (first word of canonicalName) if it is missing"""
+    if "genus" not in df.columns and "canonicalName" in df.columns:
+        df["genus"] = df["canonicalName"].fillna("").astype(str).str.split().str[0].fillna("")
+    return df
+
+
+def arrow_schema(columns):
+    import pyarrow as pa
+    return pa.schema([
+        (name, pa.dictionary(pa.int32(), pa.string()) if name in DICTIONARY_COLUMNS else pa.string())
+        for name in columns
+    ])
+
+
+class ParquetTableWriter:
+    """Appends dataframe chunks to a Parquet file; the file appears only on close()"""
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp = path + ".tmp"
+        self.writer = None
+        self.schema = None
+        self.rows = 0
+
+    def write(self, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        df = with_genus(df.copy())
+        if self.writer is None:
+            self.schema = arrow_schema(df.columns)
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self.writer = pq.ParquetWriter(self.tmp, self.schema, compression="zstd")
+        df = df[self.schema.names]
+        df = df.astype({name: "string" for name in self.schema.names})
+        self.writer.write_table(pa.Table.from_pandas(df, schema=self.schema, preserve_index=False))
+        self.rows += len(df)
+
+    def close(self):
+        if self.writer is None:
+            return
+        self.writer.close()
+        self.writer = None
+        os.replace(self.tmp, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if exc[0] is None:
+            self.close()
+        elif self.writer is not None:
+            self.writer.close()
+            os.remove(self.tmp)
+
+
+def write_species(df, path):
+    with ParquetTableWriter(path) as writer:
+        writer.write(df)
+
+
+def csv_to_parquet(csv_path, path=None, chunksize=CHUNK_SIZE, encoding="utf-8-sig"):
+    """Convert a species CSV chunk by chunk; returns the Parquet path"""
+    path = path or parquet_path(csv_path)
+    with ParquetTableWriter(path) as writer:
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize, encoding=encoding):
+            writer.write(chunk)
+    return path
+
+
+def _project(available, columns):
+    return None if columns is None else [c for c in columns if c in available]
+
+
+def species_columns(path, encoding="utf-8-sig"):
+    """Column names of the table, without reading its rows"""
+    if is_parquet(path):
+        import pyarrow.parquet as pq
+        return pq.read_schema(path).names
+    return pd.read_csv(path, nrows=0, encoding=encoding).columns.tolist()
+
+
+def read_species(path, columns=None, encoding="utf-8-sig"):
+    """The whole table, or only `columns` (names the file lacks are skipped)"""
+    if is_parquet(path):
+        import pyarrow.parquet as pq
+        names = pq.read_schema(path).names
+        return pd.read_parquet(path, columns=_project(names, columns))
+    usecols = None if columns is None else (lambda c: c in columns)
+    return pd.read_csv(path, usecols=usecols, encoding=encoding)
+
+
+def iter_species(path, columns=None, chunksize=CHUNK_SIZE, encoding="utf-8-sig"):
+    """The table as dataframes of at most chunksize rows"""
+    if is_parquet(path):
+        import pyarrow.parquet as pq
+        pf = pq.ParquetFile(path)
+        for batch in pf.iter_batches(batch_size=chunksize, columns=_project(pf.schema_arrow.names, columns)):
+            yield batch.to_pandas()
+        return
+    usecols = None if columns is None else (lambda c: c in columns)
+    yield from pd.read_csv(path, usecols=usecols, chunksize=chunksize, encoding=encoding)
+
+
+if __name__ == "__main__":
+    tables = {path: "utf-8-sig" for path in sys.argv[1:]} or DATA_TABLES
+    for csv_path, encoding in tables.items():
+        if os.path.exists(csv_path):
+            out = csv_to_parquet(csv_path, encoding=encoding)
+            print(f"{csv_path} -> {out} ({os.path.getsize(csv_path)} -> {os.path.getsize(out)} bytes)")
@@ -0,0 +1,121 @@
+import os
+import torch
+from transformers import (
+    GPT2TokenizerFast,
+    GPT2LMHeadModel,
+    Trainer,
+    set_seed,
+    TrainingArguments,
+    LogitsProcessorList,
+    StoppingCriteriaList,
+)
+from .constraint import build_token_index, save_token_index, BinomialStoppingCriteria, LatinEpithetLogitsProcessor
+from .dataset import BinomialCollator, LengthBucketSampler
+from .prepare import MAX_LENGTH, TABLE_PATH, TOKEN_CACHE_DIR, VAL_SIZE, load_datasets
+
+# settings (the table, token cache and split come from binomial.prepare)
+MODEL_NAME = "gpt2"
+OUTPUT_DIR = "gpt2-finetuned-binomial"
+BATCH_SIZE = 8
+EPOCHS = 10
+LR = 5e-5
+SEED = 42
+EXAMPLE_PROMPT = "Description: a small white bear\nFamily: Ursidae\nName: "
+
+
+class LengthBucketTrainer(Trainer):
+    """Trainer that draws training batches of similar length"""
+
+    def __init__(self, *args, seed=SEED, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.bucket_seed = seed
+
+    def _get_train_sampler(self, *args, **kwargs):
+        return LengthBucketSampler(self.train_dataset.lengths, self.args.per_device_train_batch_size,
+                                   seed=self.bucket_seed)
+
+
+def example_generation(model, tokenizer, token_index, prompt=EXAMPLE_PROMPT):
+    model.eval()
+    input_ids = tokenizer(prompt, return_tensors="pt").input_ids.to(model.device)
+    latin_processor = LatinEpithetLogitsProcessor(tokenizer, token_index, num_beams=5)
+
+    with torch.no_grad():
+        output = model.generate(
+            input_ids,
+            max_length=input_ids.shape[1] + 40,
+            num_beams=5,
+            do_sample=False,
+            logits_processor=LogitsProcessorList([latin_processor]),
+            stopping_criteria=StoppingCriteriaList([BinomialStoppingCriteria(tokenizer, token_index)]),
+            pad_token_id=tokenizer.pad_token_id,
+            early_stopping=True,
+        )
+
+    generated_text = tokenizer.decode(output[0], skip_special_tokens=True)
+    print("Prompt:")
+    print(prompt)
+    print("Generated scientific name:")
+    print(generated_text.split("Name:")[-1].strip())
+
+
+def training_arguments(output_dir, epochs=EPOCHS, batch_size=BATCH_SIZE, lr=LR, **overrides):
+    """TrainingArguments of train(); overrides replace or add arguments"""
+    args = dict(
+        output_dir=output_dir,
+        do_eval=True,
+        eval_steps=500,
+        save_steps=500,
+        learning_rate=lr,
+        per_device_train_batch_size=batch_size,
+        per_device_eval_batch_size=batch_size,
+        num_train_epochs=epochs,
+        weight_decay=0.01,
+        logging_steps=100,
+    )
+    args.update(overrides)
+    return TrainingArguments(**args)
+
+
+def train(table_path=TABLE_PATH, model_name=MODEL_NAME, output_dir=OUTPUT_DIR, epochs=EPOCHS,
+          batch_size=BATCH_SIZE, lr=LR, seed=SEED, example_prompt=EXAMPLE_PROMPT):
+    """Fine-tune model_name on the prepared rows of table_path and save it with its token index"""
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    set_seed(seed)
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Tokenizer & Model
+    tokenizer = GPT2TokenizerFast.from_pretrained(model_name)
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    model = GPT2LMHeadModel.from_pretrained(model_name)
+    model.resize_token_embeddings(len(tokenizer))
+    model.to(device)
+
+    # Dataset (prepared once by binomial.prepare, built here only if missing)
+    train_dataset, val_dataset = load_datasets(tokenizer, table_path=table_path, cache_root=TOKEN_CACHE_DIR,
+                                               max_length=MAX_LENGTH, val_size=VAL_SIZE, seed=seed)
+
+    # Training
+    training_args = training_arguments(output_dir, epochs, batch_size, lr)
+
+    trainer = LengthBucketTrainer(
+        model=model,
+        args=training_args,
+        train_dataset=train_dataset,
+        eval_dataset=val_dataset,
+        data_collator=BinomialCollator(tokenizer.pad_token_id),
+        seed=seed,
+    )
+
+    trainer.train()
+    trainer.save_model(output_dir)
+    tokenizer.save_pretrained(output_dir)
+
+    # Latinized Epithet Constraint
+    token_index = build_token_index(tokenizer)
+    save_token_index(token_index, output_dir)
+
+    if example_prompt:
+        example_generation(model, tokenizer, token_index, example_prompt)
+    return output_dir
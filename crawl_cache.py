@@ -0,0 +1,114 @@
+import json
+import time
+import hashlib
+from binomial.db import connect
+
+DEFAULT_TTL = 30 * 24 * 3600
+
+
+class ResponseCache:
+    """JSON responses keyed by URL, expiring after ttl seconds"""
+
+    def __init__(self, path, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self.conn = connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses (url TEXT PRIMARY KEY, body TEXT, fetched_at REAL)"
+        )
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, url):
+        row = self.conn.execute("SELECT body, fetched_at FROM responses WHERE url = ?", (url,)).fetchone()
+        if row is None or (self.ttl is not None and time.time() - row[1] > self.ttl):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, url, data):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses (url, body, fetched_at) VALUES (?, ?, ?)",
+            (url, json.dumps(data, ensure_ascii=False), time.time()),
+        )
+        self.conn.commit()
+
+    def purge_expired(self):
+        """Delete the responses get() would no longer serve; nothing expires without a ttl"""
+        if self.ttl is None:
+            return
+        self.conn.execute("DELETE FROM responses WHERE fetched_at < ?", (time.time() - self.ttl,))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class CrawlCheckpoint:
+    """Fetched pages and pending frontier of one crawl, updated atomically per page.
+
+    A crawl is identified by its base URL, page size and root taxa. After
+    a crash the stored pages are reloaded and only the frontier is
+    fetched; a finished crawl has an empty frontier and needs no requests.
+    A crawl started more than ttl seconds ago is discarded and run again,
+    so repeated crawls pick up GBIF updates; ttl=None keeps it forever.
+    """
+
+    def __init__(self, path, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self.conn = connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                crawl TEXT, taxon INTEGER, page_offset INTEGER, results TEXT,
+                PRIMARY KEY (crawl, taxon, page_offset));
+            CREATE TABLE IF NOT EXISTS frontier (
+                crawl TEXT, taxon INTEGER, page_offset INTEGER,
+                PRIMARY KEY (crawl, taxon, page_offset));
+            CREATE TABLE IF NOT EXISTS crawls (crawl TEXT PRIMARY KEY, started_at REAL);
+        """)
+        self.conn.commit()
+
+    @staticmethod
+    def crawl_id(base_url, page_limit, root_keys):
+        key = json.dumps([base_url, page_limit, sorted(root_keys)])
+        return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+    def start(self, crawl, root_keys):
+        """(pages, frontier) to resume from; seeds the frontier on a new or expired crawl"""
+        row = self.conn.execute("SELECT started_at FROM crawls WHERE crawl = ?", (crawl,)).fetchone()
+        if row is not None and self.ttl is not None and time.time() - row[0] > self.ttl:
+            self.reset(crawl)
+        with self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO crawls VALUES (?, ?)", (crawl, time.time()))
+        pages = {
+            (taxon, offset): json.loads(results)
+            for taxon, offset, results in self.conn.execute(
+                "SELECT taxon, page_offset, results FROM pages WHERE crawl = ?", (crawl,))
+        }
+        frontier = self.conn.execute(
+            "SELECT taxon, page_offset FROM frontier WHERE crawl = ?", (crawl,)).fetchall()
+        if not pages and not frontier:
+            frontier = [(key, 0) for key in root_keys]
+            self.conn.executemany("INSERT OR IGNORE INTO frontier VALUES (?, ?, ?)",
+                                  [(crawl, key, offset) for key, offset in frontier])
+            self.conn.commit()
+        return pages, frontier
+
+    def record(self, crawl, key, offset, results, new_entries):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)",
+                              (crawl, key, offset, json.dumps(results, ensure_ascii=False)))
+            self.conn.execute("DELETE FROM frontier WHERE crawl = ? AND taxon = ? AND page_offset = ?",
+                              (crawl, key, offset))
+            self.conn.executemany("INSERT OR IGNORE INTO frontier VALUES (?, ?, ?)",
+                                  [(crawl, k, o) for k, o in new_entries])
+
+    def reset(self, crawl):
+        with self.conn:
+            self.conn.execute("DELETE FROM pages WHERE crawl = ?", (crawl,))
+            self.conn.execute("DELETE FROM frontier WHERE crawl = ?", (crawl,))
+            self.conn.execute("DELETE FROM crawls WHERE crawl = ?", (crawl,))
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import threading
+
+
+class EpithetCache:
+    """Epithet -> meaning map backed by an append-only JSONL log.
+
+    Every update is one appended line, written under a lock, so concurrent
+    writers never interleave and a crash can at most truncate the last
+    line, which is skipped on load. The log is rewritten atomically
+    (temp file + rename) once it holds too many superseded lines. A
+    legacy JSON dict cache is imported the first time the log is created;
+    its empty strings are ambiguous and are imported as failures.
+
+    Failed lookups are stored as typed negative entries (error class,
+    message, timestamp, attempt count) next to the meanings, so a rerun
+    can retry only the failures older than its retry window.
+    """
+
+    def __init__(self, path, legacy_json=None, compact_ratio=2.0, min_compact=1000):
+        self.path = path
+        self.compact_ratio = compact_ratio
+        self.min_compact = min_compact
+        self.data = {}
+        self.failures = {}
+        self.lines = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if os.path.exists(path):
+            self._load()
+            if not self._ends_with_newline():
+                # torn final line from a crash: drop it before appending again
+                self._rewrite()
+        elif legacy_json and os.path.exists(legacy_json):
+            self._import_json(legacy_json)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                try:
+                    self._apply(json.loads(line))
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    continue
+                self.lines += 1
+
+    def _apply(self, record):
+        key = record["key"]
+        if "meaning" in record:
+            self.data[key] = record["meaning"]
+            self.failures.pop(key, None)
+        else:
+            self.failures[key] = {"error": record["error"], "message": record.get("message", ""),
+                                  "ts": record["ts"], "attempts": record.get("attempts", 1)}
+            self.data.pop(key, None)
+
+    def _ends_with_newline(self):
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return True
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _import_json(self, legacy_json):
+        with open(legacy_json, "r", encoding="utf-8") as f:
+            try:
+                legacy = json.load(f)
+            except json.JSONDecodeError:
+                legacy = {}
+        for key, meaning in legacy.items():
+            if meaning:
+                self.data[str(key)] = meaning
+            else:
+                self.failures[str(key)] = {"error": "LegacyEmpty", "message": "", "ts": 0.0, "attempts": 1}
+        self._rewrite()
+
+    def _rewrite(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for key, meaning in self.data.items():
+                f.write(json.dumps({"key": key, "meaning": meaning}, ensure_ascii=False) + "\n")
+            for key, failure in self.failures.items():
+                f.write(json.dumps({"key": key, **failure}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self.lines = len(self.data) + len(self.failures)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __len__(self):
+        return len(self.data)
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def items(self):
+        return list(self.data.items())
+
+    def needs_fetch(self, key, retry_after):
+        """True unless the key has a meaning or failed less than retry_after seconds ago"""
+        if key in self.data:
+            return False
+        failure = self.failures.get(key)
+        return failure is None or time.time() - failure["ts"] >= retry_after
+
+    def _append(self, record):
+        with self._lock:
+            self._append_locked(record)
+
+    def _append_locked(self, record):
+        self._apply(record)
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.lines += 1
+        live = len(self.data) + len(self.failures)
+        if self.lines > self.min_compact and self.lines > self.compact_ratio * live:
+            self._compact_locked()
+
+    def __setitem__(self, key, meaning):
+        self._append({"key": key, "meaning": meaning})
+
+    def set_failure(self, key, error):
+        """Record a failed lookup; error is the exception (or a class name)"""
+        with self._lock:
+            previous = self.failures.get(key)   # read under the lock so concurrent failures all count
+            self._append_locked({
+                "key": key,
+                "error": error if isinstance(error, str) else type(error).__name__,
+                "message": "" if isinstance(error, str) else str(error)[:200],
+                "ts": time.time(),
+                "attempts": previous["attempts"] + 1 if previous else 1,
+            })
+
+    def _compact_locked(self):
+        self._file.close()
+        self._rewrite()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def compact(self):
+        with self._lock:
+            self._compact_locked()
+
+    def close(self):
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
@@ -0,0 +1,238 @@
+"""Generate names for the same held-out rows with several backends at once and score them.
+
+The rows come from the validation split the GPT-2 model was trained with
+(binomial.prepare), so every backend sees descriptions it was not trained
+on. Backends run concurrently, one thread each; a remote backend also
+keeps several requests in flight. Every name is scored with the GPT-2
+scorer of scoring_profiles.py (Latin format, family, semantic consistency,
+novelty and closest known species) and compared with the true binomial of
+its row.
+
+No remote client is wired in by default: the "mock-upper-bound" row is a
+MockLLM, which picks genera from the scorer's own genus -> family index and
+so passes the family check by construction. It exercises the remote path
+(batching, rate limit, parsing, latency) and marks the ceiling of the
+format and family metrics; it is not a model to compare against.
+
+    python evaluate_backends.py [MODEL_DIR] [SAMPLES] [OUTPUT]
+
+writes OUTPUT (one row per backend and held-out row) and OUTPUT with a
+_summary suffix (one row per backend: accuracy next to names/sec and
+request latency), both as Parquet.
+"""
+import os
+import re
+import sys
+import time
+import random
+import hashlib
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from binomial.evaluation import TABLE_PATH
+from binomial.generation import MODEL_DIR, generate, load_model
+from binomial.prepare import load_examples, prepare
+from binomial.server import percentile
+from name_scoring import BACKEND_RESULTS_PATH, split_names, summarize
+from rate_limit import RateLimiter
+from scoring_profiles import gpt2_scorer
+
+# settings
+SAMPLES = 200
+OUTPUT_PATH = BACKEND_RESULTS_PATH
+LOCAL_BATCH_SIZE = 8
+LOCAL_REQUEST_SIZE = 32   # pairs per generate() call, the unit of local latency
+REMOTE_BATCH_SIZE = 10    # prompts per remote request
+REMOTE_WORKERS = 4        # remote requests in flight
+REMOTE_REQUESTS_PER_SEC = 5.0
+MOCK_LATENCY_MS = 400
+MOCK_JITTER_MS = 200
+EPITHET_SUFFIXES = ["us", "a", "um", "is", "ensis", "i"]
+
+
+def summary_path(path):
+    root, ext = os.path.splitext(path)
+    return f"{root}_summary{ext}"
+
+
+def held_out_rows(model_dir=MODEL_DIR, samples=SAMPLES, table_path=TABLE_PATH):
+    """description / family / genus / epithet of the first `samples` validation rows"""
+    _, tokenizer, _ = load_model(model_dir)
+    cache_dir, _, val_idx = prepare(tokenizer, table_path)
+    rows = load_examples(cache_dir, val_idx[:samples])
+    rows["family"] = rows["family"].astype(str)
+    return rows
+
+
+class LocalModelBackend:
+    """The fine-tuned GPT-2, in requests of LOCAL_REQUEST_SIZE pairs"""
+
+    def __init__(self, name="gpt2", model_dir=MODEL_DIR, batch_size=LOCAL_BATCH_SIZE,
+                 request_size=LOCAL_REQUEST_SIZE):
+        self.name = name
+        self.model_dir = model_dir
+        self.batch_size = batch_size
+        self.request_size = request_size
+
+    def run(self, pairs):
+        """(names, [(pairs, seconds) of each request])"""
+        load_model(self.model_dir)   # loading is not part of the latency
+        names, requests = [], []
+        for start in range(0, len(pairs), self.request_size):
+            chunk = pairs[start:start + self.request_size]
+            began = time.perf_counter()
+            names += generate(chunk, self.model_dir, batch_size=self.batch_size)
+            requests.append((len(chunk), time.perf_counter() - began))
+        return names, requests
+
+
+def remote_prompt(pairs):
+    lines = [f"{i}. Description: {d}\n   Family: {f}" for i, (d, f) in enumerate(pairs, 1)]
+    return ("Invent a Latin binomial (Genus epithet) for each animal below. The genus must belong to "
+            "the given family. Answer with one numbered line per animal and nothing else.\n\n" + "\n".join(lines))
+
+
+def parse_numbered(text, n):
+    """Names of a numbered reply, by position; missing items are ''"""
+    names = [""] * n
+    for number, answer in re.findall(r"^\s*(\d+)[.)]\s*(.+)$", text, flags=re.M):
+        if 1 <= int(number) <= n:
+            names[int(number) - 1] = " ".join(answer.replace("*", "").split()[:2])
+    return names
+
+
+class RemoteLLMBackend:
+    """A chat model behind complete(prompt) -> text, asked for batch_size names per request.
+
+    Requests run on `workers` threads under a shared requests/sec limit.
+    complete can wrap any client, e.g. the OpenAI-compatible one of
+    generate_epithet_description.py.
+    """
+
+    def __init__(self, name, complete, batch_size=REMOTE_BATCH_SIZE, workers=REMOTE_WORKERS,
+                 requests_per_sec=REMOTE_REQUESTS_PER_SEC):
+        self.name = name
+        self.complete = complete
+        self.batch_size = batch_size
+        self.workers = workers
+        self.limiter = RateLimiter(requests_per_sec)
+
+    def request(self, pairs):
+        self.limiter.acquire()
+        began = time.perf_counter()
+        names = parse_numbered(self.complete(remote_prompt(pairs)), len(pairs))
+        return names, time.perf_counter() - began
+
+    def run(self, pairs):
+        """(names, [(pairs, seconds) of each request])"""
+        chunks = [pairs[i:i + self.batch_size] for i in range(0, len(pairs), self.batch_size)]
+        names, requests = [], []
+        with ThreadPoolExecutor(self.workers) as pool:
+            for chunk, (chunk_names, seconds) in zip(chunks, pool.map(self.request, chunks)):
+                names += chunk_names
+                requests.append((len(chunk), seconds))
+        return names, requests
+
+
+class MockLLM:
+    """Stands in for a remote chat model: sleeps like a network call, then answers every
+    numbered item with a genus of its family and an epithet made from a description word.
+
+    Given the scorer's genus index its family accuracy is 100% by construction, so
+    its scores are an upper bound for checking the harness, not a model result."""
+
+    def __init__(self, genus_index, latency_ms=MOCK_LATENCY_MS, jitter_ms=MOCK_JITTER_MS, seed=0):
+        self.genus_index = genus_index
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.seed = seed
+
+    def __call__(self, prompt):
+        rng = random.Random(f"{self.seed}:{hashlib.sha1(prompt.encode()).hexdigest()}")
+        time.sleep(max(0.0, self.latency_ms + rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000)
+        items = re.findall(r"^(\d+)\. Description: (.*)\n\s*Family: (.*)$", prompt, flags=re.M)
+        lines = []
+        for number, description, family in items:
+            genera = self.genus_index.genera_of(family.strip()) or ["Incertus"]
+            words = re.findall(r"[a-z]{4,}", description.lower()) or ["ignot"]
+            epithet = rng.choice(words) + rng.choice(EPITHET_SUFFIXES)
+            lines.append(f"{number}. {rng.choice(genera)} {epithet}")
+        return "\n".join(lines)
+
+
+def run_backend(backend, pairs):
+    start = time.perf_counter()
+    names, requests = backend.run(pairs)
+    return names, requests, time.perf_counter() - start
+
+
+def evaluate_backends(backends, rows, scorer):
+    """(per-row results, per-backend summary) of every backend on the held-out rows"""
+    pairs = list(zip(rows["description"], rows["family"]))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(len(backends)) as pool:
+        runs = list(pool.map(lambda backend: run_backend(backend, pairs), backends))
+    wall = time.perf_counter() - start
+
+    results, summary = [], []
+    truth = (rows["genus"].astype(str) + " " + rows["epithet"].astype(str)).to_numpy()
+    for backend, (names, requests, elapsed) in zip(backends, runs):
+        scored = scorer.score_frame(pd.DataFrame({
+            "description": rows["description"], "family": rows["family"], "generated_name": names}))
+        _, genus, epithet, _ = split_names(scored["generated_name"])
+        scored.insert(0, "backend", backend.name)
+        scored["true_name"] = truth
+        scored["exact"] = (genus + " " + epithet).to_numpy() == truth
+        scored["genus_match"] = genus.to_numpy() == rows["genus"].astype(str).to_numpy()
+        scored["latency_ms"] = [1000 * seconds for n, seconds in requests for _ in range(n)]
+        results.append(scored)
+
+        request_ms = [1000 * seconds for _, seconds in requests]
+        summary.append({
+            "backend": backend.name,
+            "rows": len(names),
+            **summarize(scored),
+            "exact_accuracy": scored["exact"].mean(),
+            "genus_accuracy": scored["genus_match"].mean(),
+            "seconds": elapsed,
+            "names_per_sec": len(names) / elapsed if elapsed else 0.0,
+            "ms_per_name": 1000 * elapsed / max(len(names), 1),
+            "requests": len(request_ms),
+            "latency_p50_ms": percentile(request_ms, 50),
+            "latency_p99_ms": percentile(request_ms, 99),
+            "wall_seconds": wall,
+        })
+    return pd.concat(results, ignore_index=True), pd.DataFrame(summary)
+
+
+def write_table(df, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    df = df.copy()
+    if "family_valid" in df:
+        df["family_valid"] = df["family_valid"].astype("boolean")
+    tmp = path + ".tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+if __name__ == "__main__":
+    model_dir = sys.argv[1] if len(sys.argv) > 1 else MODEL_DIR
+    samples = int(sys.argv[2]) if len(sys.argv) > 2 else SAMPLES
+    output = sys.argv[3] if len(sys.argv) > 3 else OUTPUT_PATH
+
+    scorer = gpt2_scorer()
+    rows = held_out_rows(model_dir, samples)
+    backends = [
+        LocalModelBackend("gpt2", model_dir),
+        RemoteLLMBackend("mock-upper-bound", MockLLM(scorer.genus_index)),
+    ]
+    results, summary = evaluate_backends(backends, rows, scorer)
+    write_table(results, output)
+    write_table(summary, summary_path(output))
+
+    print(f"{len(rows)} held-out rows, {len(backends)} backends in {summary['wall_seconds'].iloc[0]:.1f}s "
+          f"(sum of backend times {summary['seconds'].sum():.1f}s)")
+    columns = ["format_accuracy", "family_accuracy", "family_coverage", "semantic_accuracy", "exact_accuracy",
+               "genus_accuracy", "novel_name_rate", "near_copy_rate", "names_per_sec", "latency_p50_ms", "latency_p99_ms"]
+    print(summary.set_index("backend")[[c for c in columns if c in summary]].T.to_string(float_format="{:.3f}".format))
+    print("mock-upper-bound answers from the scorer's own genus index: a harness check, not a model")
+    print(f"-> {output}, {summary_path(output)}")
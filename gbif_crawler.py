@@ -0,0 +1,202 @@
+import time
+import asyncio
+from urllib.parse import urlencode
+import aiohttp
+from rate_limit import TokenBucket
+from crawl_cache import CrawlCheckpoint
+from http_client import HEADERS, RetryPolicy, HttpStats, parse_retry_after
+
+GBIF_API = "https://api.gbif.org/v1"
+PAGE_LIMIT = 500
+LEAF_RANKS = ["SPECIES", "SUBSPECIES"]
+
+
+def compact_item(item):
+    """The fields of a children result the crawl needs later"""
+    return {
+        "key": item.get("key"),
+        "rank": item.get("rank"),
+        "scientificName": item.get("scientificName"),
+        "canonicalName": item.get("canonicalName"),
+        "authorship": item.get("authorship"),
+        "family": item.get("family"),
+    }
+
+
+def species_record(item):
+    return {
+        "scientificName": item.get("scientificName"),
+        "canonicalName": item.get("canonicalName"),
+        "authorship": item.get("authorship"),
+        "family": item.get("family"),
+    }
+
+
+class GbifCrawler:
+    """Breadth-first crawl of the GBIF taxonomy.
+
+    A fixed pool of worker tasks drains a shared queue of (taxon key,
+    offset) pages, every request first takes a token from one shared
+    bucket, and children are paged with offset / endOfRecords. Pages are
+    kept per taxon so the species list can be emitted in the same
+    depth-first order as a serial crawl. base_url can point at a local
+    stub server serving canned GBIF JSON.
+
+    With a ResponseCache, fresh responses are served from disk; with a
+    CrawlCheckpoint, every fetched page and the remaining frontier are
+    persisted so an interrupted crawl resumes where it stopped.
+    """
+
+    def __init__(self, base_url=GBIF_API, concurrency=8, rate=10, page_limit=PAGE_LIMIT,
+                 policy=None, timeout=30, cache=None, checkpoint=None, stats=None):
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = concurrency
+        self.limiter = TokenBucket(rate)
+        self.page_limit = page_limit
+        self.policy = policy or RetryPolicy()
+        self.stats = stats or HttpStats()
+        self.timeout = timeout
+        self.cache = cache
+        self.checkpoint = checkpoint
+        self.crawl_key = None
+        self.session = None
+
+    async def __aenter__(self):
+        self.session = aiohttp.ClientSession(
+            headers=HEADERS,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            connector=aiohttp.TCPConnector(limit=self.concurrency),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    async def get_json(self, path, params=None):
+        url = f"{self.base_url}{path}"
+        if params:
+            url = f"{url}?{urlencode(sorted(params.items()))}"
+        if self.cache is not None:
+            data = self.cache.get(url)
+            if data is not None:
+                return data
+        retries = self.policy.max_retries
+        for i in range(retries):
+            await self.limiter.acquire_async()
+            retry_after = None
+            start = time.perf_counter()
+            try:
+                async with self.session.get(url) as r:
+                    if r.status == 200:
+                        data = await r.json(content_type=None)
+                        self.stats.record(url, r.status, time.perf_counter() - start)
+                        if self.cache is not None:
+                            self.cache.put(url, data)
+                        return data
+                    self.stats.record(url, r.status, time.perf_counter() - start)
+                    if not self.policy.should_retry(r.status):
+                        print(f"⚠️ HTTP {r.status} — not retrying: {url}")
+                        return None
+                    retry_after = parse_retry_after(r.headers.get("Retry-After"))
+                    print(f"⚠️ HTTP {r.status} — wait & retry ({i+1}/{retries})")
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                self.stats.record(url, None, time.perf_counter() - start)
+                print(f"⚠️ Request error {e} — retrying ({i+1}/{retries})")
+            if i + 1 < retries:
+                self.stats.record_retry(url)
+                await asyncio.sleep(self.policy.delay(i, retry_after))
+        print(" All retries failed:", url)
+        return None
+
+    async def match_key(self, name):
+        """Get GBIF taxonKey for a given family name"""
+        data = await self.get_json("/species/match", {"name": name})
+        return data.get("usageKey") if data else None
+
+    async def crawl(self, root_keys):
+        """Species under each root key, as {root_key: [records]}"""
+        pages = {}
+        frontier = [(key, 0) for key in root_keys]
+        if self.checkpoint is not None:
+            self.crawl_key = CrawlCheckpoint.crawl_id(self.base_url, self.page_limit, root_keys)
+            pages, frontier = self.checkpoint.start(self.crawl_key, root_keys)
+            if pages:
+                print(f"Crawl checkpoint: {len(pages)} pages done, {len(frontier)} pending")
+        seen = set(root_keys)
+        for results in pages.values():
+            seen.update(item["key"] for item in results if item["rank"] not in LEAF_RANKS)
+        queue = asyncio.Queue()
+        for entry in frontier:
+            queue.put_nowait(tuple(entry))
+        workers = [asyncio.create_task(self._worker(queue, pages, seen)) for _ in range(self.concurrency)]
+        try:
+            await queue.join()
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        return {key: self._collect(key, pages) for key in root_keys}
+
+    async def _worker(self, queue, pages, seen):
+        while True:
+            key, offset = await queue.get()
+            try:
+                data = await self.get_json(f"/species/{key}/children",
+                                           {"limit": self.page_limit, "offset": offset})
+                if not data:
+                    continue
+                results = [compact_item(item) for item in data.get("results", [])]
+                pages[(key, offset)] = results
+                new_entries = []
+                if results and not data.get("endOfRecords", True):
+                    new_entries.append((key, offset + len(results)))
+                for item in results:
+                    sub_key = item["key"]
+                    if item["rank"] not in LEAF_RANKS and sub_key not in seen:
+                        seen.add(sub_key)
+                        new_entries.append((sub_key, 0))
+                if self.checkpoint is not None:
+                    self.checkpoint.record(self.crawl_key, key, offset, results, new_entries)
+                for entry in new_entries:
+                    queue.put_nowait(entry)
+            except Exception as e:
+                print(f"⚠️ Failed to process taxon {key} at offset {offset}: {e}")
+            finally:
+                queue.task_done()
+
+    @staticmethod
+    def _children(key, pages):
+        offset = 0
+        while (key, offset) in pages and pages[(key, offset)]:
+            yield from pages[(key, offset)]
+            offset += len(pages[(key, offset)])
+
+    def _collect(self, key, pages):
+        names = []
+        stack = [self._children(key, pages)]
+        while stack:
+            item = next(stack[-1], None)
+            if item is None:
+                stack.pop()
+                continue
+            rank = item.get("rank")
+            if rank == "SPECIES":
+                names.append(species_record(item))
+            elif rank not in LEAF_RANKS:
+                stack.append(self._children(item.get("key"), pages))
+        return names
+
+
+async def crawl_families(families, **kwargs):
+    """All species of the given families, in family order"""
+    kwargs.setdefault("stats", HttpStats())
+    async with GbifCrawler(**kwargs) as crawler:
+        keys = await asyncio.gather(*(crawler.match_key(fam) for fam in families))
+        for fam, key in zip(families, keys):
+            print(f"{fam}: key={key}")
+        found = await crawler.crawl([key for key in keys if key is not None])
+    all_species = []
+    for key in keys:
+        if key is not None:
+            all_species.extend(found[key])
+    return all_species
@@ -1,22 +1,32 @@
 import os
 import time, random, json
+import numpy as np
 import pandas as pd
 from openai import OpenAI
+from contextlib import nullcontext
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
+from rate_limit import RateLimiter
+from epithet_cache import EpithetCache
+from binomial.species_table import ParquetTableWriter, iter_species, read_species, species_columns, parquet_path
 
 # ============================= 基础配置 =============================
 API_KEY = "An API key should be placed here"  
-BASE_URL = "https://api.deepseek.com/v1"
+BASE_URL = os.environ.get("EPITHET_API_BASE_URL", "https://api.deepseek.com/v1")
 MODEL_NAME = "deepseek-chat"
 
-INPUT_CSV  = "data/species_list.csv"
+INPUT_CSV  = "data/species_list.csv"   # a .parquet from binomial.species_table works too
 OUTPUT_CSV = "data/species_with_description_fixed.csv"
-CACHE_FILE = "data/epithet_cache.json"
+OUTPUT_PARQUET = parquet_path(OUTPUT_CSV)
+CACHE_FILE = "data/epithet_cache.jsonl"
+LEGACY_CACHE_FILE = "data/epithet_cache.json"   # imported once into CACHE_FILE
 
 MAX_WORKERS = 5 
-MIN_INTERVAL = 1.0  
-BATCH_SAVE = 20        
+REQUESTS_PER_SEC = 5.0   # provider limit, shared by all workers
+TOKENS_PER_MIN = None    # e.g. 60000; None disables the token budget
+EPITHETS_PER_REQUEST = 20   # 1 = one request per epithet
+RETRY_FAILED_AFTER = 6 * 3600   # seconds before a failed epithet is requested again
+CHUNK_SIZE = 100_000   # rows read, enriched and written at a time; None loads the whole CSV
 
 family_map = {
     "Crocodylidae": "crocodile",
@@ -34,27 +44,22 @@ family_map = {
 # ============================= initialization =============================
 os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
 client = OpenAI(api_key=API_KEY, base_url=BASE_URL)
+limiter = RateLimiter(REQUESTS_PER_SEC, TOKENS_PER_MIN)
 
 
-cache = {}
-if os.path.exists(CACHE_FILE):
-    with open(CACHE_FILE, "r", encoding="utf-8") as f:
-        try:
-            cache = json.load(f)
-        except json.JSONDecodeError:
-            cache = {}
-print(f"🔹 已加载缓存：{len(cache)} 条记录")
+cache = EpithetCache(CACHE_FILE, legacy_json=LEGACY_CACHE_FILE)
+print(f"🔹 已加载缓存：{len(cache)} 条记录, {len(cache.failures)} failed")
 
-last_call = 0.0  # 用于每线程限速控制
-cache_updates = 0
+def estimate_tokens(prompt, max_output=32):
+    return len(prompt) // 4 + max_output
 
 def explain_epithet(epithet, retries=3, delay=3):
     """解释种加词含义，带限速与重试"""
-    global last_call, cache_updates
-
     key = epithet.lower().strip()
     if key in cache:  
         return cache[key]
+    if not cache.needs_fetch(key, RETRY_FAILED_AFTER):
+        return ""
 
     prompt = f"""
     You are a biologist and Latin expert.
@@ -64,81 +69,186 @@ def explain_epithet(epithet, retries=3, delay=3):
     Output only the phrase, no extra commentary.
     """
 
-    now = time.time()
-    diff = now - last_call
-    if diff < MIN_INTERVAL:
-        time.sleep(MIN_INTERVAL - diff)
-
+    estimated = estimate_tokens(prompt)
+    error = "Unknown"
     for attempt in range(retries):
+        limiter.acquire(estimated)
         try:
             completion = client.chat.completions.create(
                 model=MODEL_NAME,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.2,
             )
+            usage = getattr(completion, "usage", None)
+            limiter.settle(estimated, getattr(usage, "total_tokens", None))
             meaning = completion.choices[0].message.content.strip()
             cache[key] = meaning
-            cache_updates += 1
-            last_call = time.time()
-            if cache_updates % BATCH_SAVE == 0:
-                with open(CACHE_FILE, "w", encoding="utf-8") as f:
-                    json.dump(cache, f, ensure_ascii=False, indent=2)
             return meaning
         except Exception as e:
+            error = e
             time.sleep(delay)
             continue
 
-    cache[key] = ""
+    cache.set_failure(key, error)
     return ""
 
-# ============================= Generate Description =============================
-def generate_description(family, canonical_name):
-    epithet = canonical_name.split()[-1]
-    meaning = explain_epithet(epithet)
-    fam = family_map.get(family, "animal")
-    if not meaning:
-        return f"a {fam}"
-    m_clean = meaning.strip("'\" ")
-    m_lower = m_clean.lower()
-
-    if m_lower.startswith("named after"):
-        # 使用原始 m_clean 回填，保留大小写
-        return f"a {fam} {m_clean}"
-    elif m_lower.startswith("from"):
-        return f"a {fam} {m_clean}"
-    elif any(m_lower.endswith(suf) for suf in ["ed", "like", "shaped"]):
-        return f"a {m_clean} {fam}"
-    else:
-        return f"a {fam} that resembles {m_clean}"
-
-# ============================= Main Process =============================
-if __name__ == "__main__":
-    df = pd.read_csv(INPUT_CSV)
-    print(f"Loaded {len(df)} records")
+def parse_batch_reply(content, keys):
+    """{key: meaning} for the requested keys with a usable answer in a JSON reply"""
+    text = content.strip()
+    if not text.startswith("{"):
+        # tolerate code fences or a sentence around the object
+        text = text[text.find("{"):text.rfind("}") + 1]
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    answers = {str(k).lower().strip(): v for k, v in data.items()}
+    meanings = {}
+    for key in keys:
+        value = answers.get(key)
+        if isinstance(value, str) and value.strip() and len(value) <= 200:
+            meanings[key] = value.strip()
+    return meanings
+
+def explain_epithets_batch(epithets, retries=3, delay=3):
+    """Explain several epithets with one request; returns only the validated answers.
+
+    Epithets missing from the reply are left for explain_epithet to retry one by one.
+    """
+    keys = list(dict.fromkeys(e.lower().strip() for e in epithets
+                              if cache.needs_fetch(e.lower().strip(), RETRY_FAILED_AFTER)))
+    if not keys:
+        return {}
 
-    df["canonicalName"] = df["canonicalName"].fillna("").astype(str)
-    df["epithet"] = df["canonicalName"].str.split().str[-1].fillna("").astype(str)
+    listing = "\n".join(f"- {k}" for k in keys)
+    prompt = f"""
+    You are a biologist and Latin expert.
+    For each Latin or Greek epithet below, explain in English what it means in a biological naming context.
+    Give a very short phrase (3-10 words) for each, such as
+    'narrow-headed', 'from China', 'named after Anderson', 'black and white', etc.
+    Reply with a single JSON object mapping every epithet exactly as written to its phrase, nothing else.
+    Epithets:
+    {listing}
+    """
 
-    unique_epithets = df["epithet"].unique().tolist()
-    print(f"Remaining {len(unique_epithets)} epithets need to explain")
+    estimated = estimate_tokens(prompt, max_output=16 * len(keys))
+    for attempt in range(retries):
+        limiter.acquire(estimated)
+        try:
+            completion = client.chat.completions.create(
+                model=MODEL_NAME,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.2,
+                response_format={"type": "json_object"},
+            )
+            usage = getattr(completion, "usage", None)
+            limiter.settle(estimated, getattr(usage, "total_tokens", None))
+            meanings = parse_batch_reply(completion.choices[0].message.content or "", keys)
+            for key, meaning in meanings.items():
+                cache[key] = meaning
+            return meanings
+        except Exception as e:
+            time.sleep(delay)
+            continue
+    return {}
 
+def explain_all(epithets, batch_size=EPITHETS_PER_REQUEST):
+    """Fill the cache for all epithets: batched requests first, then single retries"""
+    pending = [e for e in epithets if cache.needs_fetch(e.lower().strip(), RETRY_FAILED_AFTER)]
     with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {executor.submit(explain_epithet, e): e for e in unique_epithets}
+        if batch_size > 1:
+            batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+            futures = [executor.submit(explain_epithets_batch, b) for b in batches]
+            for _ in tqdm(as_completed(futures), total=len(futures), desc="Fetching epithet batches"):
+                pass
+            pending = [e for e in pending if cache.needs_fetch(e.lower().strip(), RETRY_FAILED_AFTER)]
+        futures = {executor.submit(explain_epithet, e): e for e in pending}
         for _ in tqdm(as_completed(futures), total=len(futures), desc="Fetching epithets"):
             pass
-    with open(CACHE_FILE, "w", encoding="utf-8") as f:
-        json.dump(cache, f, ensure_ascii=False, indent=2)
-    print(f"Cache updated with {len(cache)} entries")
-
-    descriptions = []
-    for _, row in tqdm(df.iterrows(), total=len(df), desc="Generating descriptions"):
-        key = str(row["epithet"]).strip().lower()  
-        meaning = cache.get(key, "")
-        fam = row["family"]
-        canon = row["canonicalName"]
-        descriptions.append(generate_description(fam, canon))
-
-    df["description"] = descriptions
-    os.makedirs(os.path.dirname(OUTPUT_CSV), exist_ok=True)
-    df.to_csv(OUTPUT_CSV, index=False, encoding="utf-8-sig")
-    print(f"\n Result saved to: {OUTPUT_CSV}")
\ No newline at end of file
+
+# ============================= Generate Description =============================
+def build_descriptions(df, meanings):
+    """Description of every row of a dataframe from its family and epithet meaning.
+
+    "a {fam} {meaning}" for "named after ..." / "from ..." meanings, "a
+    {meaning} {fam}" for ones ending in -ed / -like / -shaped, and "a {fam}
+    that resembles {meaning}" otherwise. Epithets are joined to their
+    meanings with one merge and the templates are chosen with vectorized
+    string tests. Meanings missing from `meanings` (failed lookups) give
+    the plain "a {fam}" form.
+    """
+    epithet = df["canonicalName"].fillna("").astype(str).str.split().str[-1].fillna("")
+    keys = pd.DataFrame({"key": epithet.str.lower().str.strip().to_numpy()})
+    table = pd.DataFrame({"key": list(meanings.keys()), "meaning": list(meanings.values())})
+    meaning = keys.merge(table, on="key", how="left")["meaning"].fillna("").astype(str)
+
+    fam = df["family"].astype(object).map(family_map).fillna("animal").astype(str).to_numpy(dtype=object)
+    m_clean = meaning.str.strip("'\" ")
+    m_lower = m_clean.str.lower()
+    m_clean = m_clean.to_numpy(dtype=object)
+
+    empty = (meaning == "").to_numpy()
+    prefix = (m_lower.str.startswith("named after") | m_lower.str.startswith("from")).to_numpy()
+    suffix = m_lower.str.endswith(("ed", "like", "shaped")).to_numpy()
+    descriptions = np.select(
+        [empty, prefix, suffix],
+        ["a " + fam, "a " + fam + " " + m_clean, "a " + m_clean + " " + fam],
+        "a " + fam + " that resembles " + m_clean,
+    )
+    return pd.Series(descriptions, index=df.index, dtype=object)
+
+def stream_descriptions(input_csv, output_csv, chunksize=CHUNK_SIZE, output_parquet=None):
+    """Read input_csv in chunks, enrich each from the epithet cache and append it to output_csv.
+
+    Only one chunk and the epithet cache are held in memory. The output is
+    written to a temporary file and moved into place once complete; with
+    output_parquet the same rows are also written as Parquet, finished
+    before the CSV is moved. On an error neither output is left behind.
+    """
+    reader = iter_species(input_csv, chunksize=chunksize) if chunksize else [read_species(input_csv)]
+    columns = species_columns(input_csv)
+    columns += [c for c in ["epithet", "description"] if c not in columns]
+    tmp = output_csv + ".tmp"
+    os.makedirs(os.path.dirname(output_csv) or ".", exist_ok=True)
+    rows = 0
+    try:
+        # the Parquet writer finishes its file on success and discards it on an error
+        with ParquetTableWriter(output_parquet) if output_parquet else nullcontext() as parquet:
+            with open(tmp, "w", encoding="utf-8-sig", newline="") as f:
+                pd.DataFrame(columns=columns).to_csv(f, index=False)   # header even when there are no rows
+                for i, df in enumerate(reader):
+                    df["canonicalName"] = df["canonicalName"].fillna("").astype(str)
+                    df["epithet"] = df["canonicalName"].str.split().str[-1].fillna("").astype(str)
+
+                    unique_epithets = df["epithet"].unique().tolist()
+                    pending = [e for e in unique_epithets if cache.needs_fetch(e.lower().strip(), RETRY_FAILED_AFTER)]
+                    print(f"Chunk {i}: {len(df)} records, "
+                          f"{len(pending)} of {len(unique_epithets)} epithets need to explain")
+                    if pending:
+                        explain_all(pending)
+
+                    df["description"] = build_descriptions(df, cache.data)
+                    df[columns].to_csv(f, header=False, index=False)
+                    if parquet is not None:
+                        parquet.write(df)
+                    rows += len(df)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    os.replace(tmp, output_csv)
+    return rows
+
+# ============================= Main Process =============================
+if __name__ == "__main__":
+    rows = stream_descriptions(INPUT_CSV, OUTPUT_CSV, output_parquet=OUTPUT_PARQUET)
+    print(f"Processed {rows} records")
+
+    cache.compact()
+    print(f"Cache updated with {len(cache)} entries, {len(cache.failures)} failed "
+          f"(retried after {RETRY_FAILED_AFTER}s)")
+    print(f"API requests: {limiter.count}, achieved {limiter.achieved_qps():.2f} req/s "
+          f"(limit {REQUESTS_PER_SEC} req/s)")
+    print(f"\n Result saved to: {OUTPUT_CSV} and {OUTPUT_PARQUET}")
@@ -0,0 +1,172 @@
+"""Genus -> family index built from the crawled species tables.
+
+Genera and families are sorted name lists, and every (genus, family) pair
+is the int64 key genus_id * n_families + family_id in one sorted array.
+Names are resolved to ids with a hash index (pandas get_indexer, O(1) per
+name) and pairs are checked with np.searchsorted, so a whole evaluation set
+is checked in one vectorized call. On disk the names are newline-joined
+UTF-8 next to the key array in one uncompressed .npz, which loads in
+milliseconds; the index is rebuilt when a source table changes (size or
+mtime).
+
+    python genus_index.py [TABLE ...]   build data/genus_family_index.npz (default: data/species_list.csv)
+"""
+import os
+import sys
+import json
+import numpy as np
+import pandas as pd
+from binomial.species_table import DATA_TABLES, iter_species, with_genus
+
+SOURCES = ["data/species_list.csv"]
+INDEX_PATH = "data/genus_family_index.npz"
+INDEX_VERSION = 1
+
+
+def sources_fingerprint(paths):
+    stats = []
+    for path in paths:
+        st = os.stat(path)
+        stats.append([os.path.abspath(path), st.st_size, st.st_mtime_ns])
+    return json.dumps([INDEX_VERSION, stats])
+
+
+def _lookup(index, names):
+    """Position of each name in index, -1 where missing; each distinct name is looked up once"""
+    codes, uniques = pd.factorize(np.asarray(names, dtype=object))
+    ids = np.append(index.get_indexer(uniques), -1).astype(np.int64)
+    return ids[codes]   # code -1 (None / NaN) picks the trailing -1
+
+
+def pack_names(names):
+    """Names as one newline-joined UTF-8 byte array, the on-disk form"""
+    return np.frombuffer("\n".join(names).encode("utf-8"), dtype=np.uint8)
+
+
+def unpack_names(blob):
+    text = blob.tobytes().decode("utf-8")
+    return np.array(text.split("\n") if text else [], dtype=object)
+
+
+class GenusFamilyIndex:
+    """Which families each genus belongs to; a genus can appear under several families"""
+
+    def __init__(self, genera, families, pairs, fingerprint=""):
+        self.genera = genera
+        self.families = families
+        self.pairs = pairs
+        self.fingerprint = fingerprint
+        self._genus_ids = None
+        self._family_ids = None
+
+    def _indexes(self):
+        """Hash indexes of the names, built on the first lookup so loading stays cheap"""
+        if self._genus_ids is None:
+            self._genus_ids = pd.Index(self.genera, dtype=object)
+            self._family_ids = pd.Index(self.families, dtype=object)
+        return self._genus_ids, self._family_ids
+
+    @classmethod
+    def from_pairs(cls, pairs, fingerprint=""):
+        """Index of an iterable of (genus, family) pairs"""
+        pairs = {(str(g), str(f)) for g, f in pairs if isinstance(g, str) and isinstance(f, str) and g and f}
+        genera = np.array(sorted({g for g, _ in pairs}), dtype=object)
+        families = np.array(sorted({f for _, f in pairs}), dtype=object)
+        index = cls(genera, families, np.zeros(0, dtype=np.int64), fingerprint)
+        if pairs:
+            g, f = zip(*pairs)
+            index.pairs = np.sort(index.genus_ids(g) * len(families) + index.family_ids(f))
+        return index
+
+    @classmethod
+    def from_mapping(cls, mapping):
+        """Index of a {family: [genus, ...]} dict"""
+        return cls.from_pairs((genus, family) for family, genera in mapping.items() for genus in genera)
+
+    @classmethod
+    def build(cls, paths=SOURCES):
+        """Index of the genus / family columns of species tables (.csv or .parquet), read in chunks"""
+        pairs = set()
+        for path in paths:
+            encoding = DATA_TABLES.get(path, "utf-8-sig")
+            for chunk in iter_species(path, columns=["canonicalName", "genus", "family"], encoding=encoding):
+                chunk = with_genus(chunk)
+                pairs.update(zip(chunk["genus"].astype(object), chunk["family"].astype(object)))
+        return cls.from_pairs(pairs, sources_fingerprint(paths))
+
+    def save(self, path=INDEX_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, genera=pack_names(self.genera), families=pack_names(self.families), pairs=self.pairs,
+                 fingerprint=np.array(self.fingerprint))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        with np.load(path) as data:
+            return cls(unpack_names(data["genera"]), unpack_names(data["families"]), data["pairs"], str(data["fingerprint"]))
+
+    def __len__(self):
+        return len(self.genera)
+
+    def __contains__(self, genus):
+        return genus in self._indexes()[0]
+
+    def genus_ids(self, genera):
+        """Position of each genus in self.genera, -1 for unknown genera"""
+        return _lookup(self._indexes()[0], genera)
+
+    def family_ids(self, families):
+        """Position of each family in self.families, -1 for unknown families"""
+        return _lookup(self._indexes()[1], families)
+
+    def families_of(self, genus):
+        """Sorted families a genus is listed under; [] if unknown"""
+        genus_ids = self._indexes()[0]
+        if genus not in genus_ids:
+            return []
+        i = genus_ids.get_loc(genus)
+        n = len(self.families)
+        lo, hi = np.searchsorted(self.pairs, [i * n, (i + 1) * n])
+        return self.families[self.pairs[lo:hi] % n].tolist()
+
+    def genera_of(self, family):
+        """Sorted genera listed under a family; [] if unknown"""
+        family_ids = self._indexes()[1]
+        if family not in family_ids:
+            return []
+        n = len(self.families)
+        return self.genera[self.pairs[self.pairs % n == family_ids.get_loc(family)] // n].tolist()
+
+    def belongs(self, genera, families):
+        """Bool array: genera[i] is listed under families[i]"""
+        g = self.genus_ids(genera)
+        f = self.family_ids(families)
+        keys = g * len(self.families) + f
+        found = np.zeros(len(keys), dtype=bool)
+        if len(self.pairs):
+            idx = np.minimum(np.searchsorted(self.pairs, keys), len(self.pairs) - 1)
+            found = self.pairs[idx] == keys
+        return found & (g >= 0) & (f >= 0)
+
+
+def load_genus_index(paths=SOURCES, path=INDEX_PATH):
+    """The saved index if it was built from the current `paths`, else a fresh (saved) build"""
+    paths = [p for p in paths if os.path.exists(p)]
+    fingerprint = sources_fingerprint(paths)
+    if os.path.exists(path):
+        index = GenusFamilyIndex.load(path)
+        if index.fingerprint == fingerprint:
+            return index
+    index = GenusFamilyIndex.build(paths)
+    index.save(path)
+    return index
+
+
+if __name__ == "__main__":
+    paths = sys.argv[1:] or SOURCES
+    index = GenusFamilyIndex.build(paths)
+    index.save(INDEX_PATH)
+    shared = sum(len(index.families_of(g)) > 1 for g in index.genera)
+    print(f"{len(index)} genera, {len(index.families)} families, {len(index.pairs)} pairs "
+          f"({shared} genera under more than one family) -> {INDEX_PATH}")
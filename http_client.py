@@ -0,0 +1,88 @@
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+HEADERS = {"User-Agent": "Mozilla/5.0 (GBIF Collector)"}
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, honoring Retry-After when the server sends one"""
+
+    def __init__(self, max_retries=5, base_delay=1.0, max_delay=60.0, retry_statuses=RETRY_STATUSES):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = set(retry_statuses)
+
+    def should_retry(self, status):
+        return status in self.retry_statuses
+
+    def delay(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return min(self.max_delay, retry_after) + random.random() * self.base_delay
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class HostStats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.latency = 0.0
+        self.max_latency = 0.0
+        self.statuses = {}
+
+
+class HttpStats:
+    """Per-host request / latency / retry counters, safe to update from threads"""
+
+    def __init__(self):
+        self.hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, url):
+        host = urlsplit(url).netloc
+        if host not in self.hosts:
+            self.hosts[host] = HostStats()
+        return self.hosts[host]
+
+    def record(self, url, status, latency):
+        with self._lock:
+            s = self._host(url)
+            s.requests += 1
+            s.latency += latency
+            s.max_latency = max(s.max_latency, latency)
+            key = status if status is not None else "error"
+            s.statuses[key] = s.statuses.get(key, 0) + 1
+            if status is None:
+                s.errors += 1
+
+    def record_retry(self, url):
+        with self._lock:
+            self._host(url).retries += 1
+
+    def summary(self):
+        lines = []
+        for host, s in sorted(self.hosts.items()):
+            mean = 1000 * s.latency / s.requests if s.requests else 0.0
+            lines.append(f"{host}: {s.requests} requests, {s.retries} retries, {s.errors} errors, "
+                         f"latency mean {mean:.0f} ms / max {1000 * s.max_latency:.0f} ms, statuses {s.statuses}")
+        return "\n".join(lines)
+
@@ -0,0 +1,111 @@
+"""Known species names, for exact-match and novelty checks of generated binomials.
+
+Holds three sets built from the canonical names of the crawled tables: the
+binomials ("Genus epithet", the first two words of every canonical name),
+the genera and the epithets, each a sorted Arrow string array. They are
+saved as the three record batches of one Arrow IPC file in data/, which is
+memory-mapped on load, and checked with pyarrow.compute.is_in (a C++ hash
+set), so a whole evaluation set is one call per set and matches are exact.
+The index is rebuilt when a source table changes, like genus_index.py.
+
+    python name_index.py [TABLE ...]   build data/name_index.arrow (default: data/species_with_description_fixed.csv)
+"""
+import os
+import sys
+import pyarrow as pa
+import pyarrow.compute as pc
+from genus_index import sources_fingerprint
+from binomial.species_table import DATA_TABLES, iter_species
+
+SOURCES = ["data/species_with_description_fixed.csv"]
+INDEX_PATH = "data/name_index.arrow"
+SETS = ["binomials", "genera", "epithets"]
+SCHEMA = pa.schema([("name", pa.string())])
+
+
+def to_arrow(names):
+    """Arrow string array of a Series, array or list of names (None stays null)"""
+    if not isinstance(names, (pa.Array, pa.ChunkedArray)):
+        names = pa.array(names, from_pandas=True)
+    return names.cast(pa.string())
+
+
+class NameIndex:
+    """Which binomials, genera and epithets are already known"""
+
+    def __init__(self, binomials, genera, epithets, fingerprint=""):
+        self.binomials = binomials
+        self.genera = genera
+        self.epithets = epithets
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def from_names(cls, canonical_names, fingerprint=""):
+        """Index of an iterable of canonical names; words after the epithet are ignored"""
+        binomials, genera, epithets = set(), set(), set()
+        for name in canonical_names:
+            words = name.split() if isinstance(name, str) else []
+            if len(words) >= 2:
+                binomials.add(words[0] + " " + words[1])
+                epithets.add(words[1])
+            if words:
+                genera.add(words[0])
+        return cls(*(pa.array(sorted(names), pa.string()) for names in (binomials, genera, epithets)),
+                   fingerprint)
+
+    @classmethod
+    def build(cls, paths=SOURCES):
+        """Index of the canonicalName column of species tables (.csv or .parquet), read in chunks"""
+        names = set()
+        for path in paths:
+            encoding = DATA_TABLES.get(path, "utf-8-sig")
+            for chunk in iter_species(path, columns=["canonicalName"], encoding=encoding):
+                names.update(chunk["canonicalName"].dropna().astype(object).unique())
+        return cls.from_names(names, sources_fingerprint(paths))
+
+    def save(self, path=INDEX_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        schema = SCHEMA.with_metadata({"fingerprint": self.fingerprint, "sets": ",".join(SETS)})
+        tmp = path + ".tmp"
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+            for key in SETS:
+                writer.write_batch(pa.record_batch([getattr(self, key)], schema=schema))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        reader = pa.ipc.open_file(pa.memory_map(path))
+        sets = [reader.get_batch(i).column(0) for i in range(len(SETS))]
+        return cls(*sets, reader.schema.metadata[b"fingerprint"].decode())
+
+    def __len__(self):
+        return len(self.binomials)
+
+    def check(self, genera, epithets):
+        """(binomial known, genus known, epithet known) bool arrays for split generated names"""
+        genera, epithets = to_arrow(genera), to_arrow(epithets)
+        binomials = pc.binary_join_element_wise(genera, epithets, " ")
+        return tuple(pc.is_in(names, value_set=known).to_numpy(zero_copy_only=False)
+                     for names, known in [(binomials, self.binomials), (genera, self.genera),
+                                          (epithets, self.epithets)])
+
+
+def load_name_index(paths=SOURCES, path=INDEX_PATH):
+    """The saved index if it was built from the current `paths`, else a fresh (saved) build"""
+    paths = [p for p in paths if os.path.exists(p)]
+    fingerprint = sources_fingerprint(paths)
+    if os.path.exists(path):
+        index = NameIndex.load(path)
+        if index.fingerprint == fingerprint:
+            return index
+    index = NameIndex.build(paths)
+    index.save(path)
+    return index
+
+
+if __name__ == "__main__":
+    paths = sys.argv[1:] or SOURCES
+    index = NameIndex.build(paths)
+    index.save(INDEX_PATH)
+    print(f"{len(index.binomials)} binomials, {len(index.genera)} genera, {len(index.epithets)} epithets "
+          f"-> {INDEX_PATH} ({os.path.getsize(INDEX_PATH)} bytes)")
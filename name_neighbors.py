@@ -0,0 +1,188 @@
+"""Closest known species of generated names by Levenshtein distance.
+
+A trigram inverted index over the known binomials proposes candidates in
+order of shared trigrams, and their distances are computed with Myers'
+bit-vector algorithm, vectorized with numpy over all (name, candidate)
+pairs of a round. A name within distance d of the query shares at least
+(query trigrams - 3 * d) of its distinct trigrams, and differs in length by
+at most d, so candidates whose bound cannot beat the best distance found
+are skipped. The result is exact: the closest known species (the first in
+trigram order on ties) and its Levenshtein distance.
+
+    python name_neighbors.py NAME ...   closest known species of each name
+"""
+import sys
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+Q = 3
+ROUND_SIZE = 16
+MAX_PAIRS = 200_000
+
+
+def levenshtein(a, b, limit):
+    """Edit distance of a and b, or limit + 1 once it is certain to exceed limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def trigram_codes(names):
+    """(row, code) of the distinct trigrams of each name, padded with two spaces in front and one behind"""
+    padded = np.array(["  " + n + " " for n in names], dtype=str)
+    if not len(padded):
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    chars = padded.view(np.uint32).reshape(len(padded), -1).astype(np.int64)
+    lengths = np.char.str_len(padded)
+    codes = (chars[:, :-2] << 42) | (chars[:, 1:-1] << 21) | chars[:, 2:]
+    rows, cols = np.nonzero(np.arange(codes.shape[1]) < (lengths - 2)[:, None])
+    pairs = np.unique(np.stack([rows, codes[rows, cols]], axis=1), axis=0)
+    return pairs[:, 0], pairs[:, 1]
+
+
+def char_matrix(strings):
+    """(codes, lengths) of strings as a fixed-width uint32 matrix"""
+    padded = np.array(list(strings) or [""], dtype=str)[:len(strings)]
+    return padded.view(np.uint32).reshape(len(padded), -1), np.char.str_len(padded)
+
+
+def bit_distances(peq, m, query, b_ids, n):
+    """Levenshtein distance of each (query, b) pair with Myers' bit-vector algorithm, all pairs at once.
+
+    peq[i, c] has bit k set where character k of query i is c (queries of 1 to 63
+    characters, lengths m); b_ids / n are the character ids and lengths of the b side."""
+    one = np.uint64(1)
+    mask = ((one << m.astype(np.uint64)) - one)[query]
+    high = (one << (m - 1).astype(np.uint64))[query]
+    pv, mv = mask.copy(), np.zeros(len(query), dtype=np.uint64)
+    score = m[query].astype(np.int64)
+    for j in range(b_ids.shape[1]):
+        active = j < n
+        eq = peq[query, b_ids[:, j]]
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        score += active * (((ph & high) != 0).astype(np.int64) - ((mh & high) != 0))
+        ph = ((ph << one) | one) & mask
+        mh = (mh << one) & mask
+        pv = np.where(active, (mh | ~(xv | ph)) & mask, pv)
+        mv = np.where(active, ph & xv, mv)
+    return score
+
+
+class NameNeighbors:
+    """Trigram index of known names for nearest-neighbour search"""
+
+    def __init__(self, names):
+        if isinstance(names, (pa.Array, pa.ChunkedArray)):
+            names = names.to_pylist()
+        self.names = np.array(sorted(set(names)), dtype=object)
+        rows, codes = trigram_codes(self.names)
+        self.grams, gram_ids = np.unique(codes, return_inverse=True)
+        order = np.argsort(gram_ids, kind="stable")
+        self.postings = rows[order]
+        self.offsets = np.searchsorted(gram_ids[order], np.arange(len(self.grams) + 1))
+        chars, self.lengths = char_matrix(self.names)
+        self.alphabet, ids = np.unique(chars, return_inverse=True)
+        self.char_ids = ids.reshape(chars.shape).astype(np.uint8 if len(self.alphabet) <= 256 else np.int32)
+
+    def __len__(self):
+        return len(self.names)
+
+    def candidates(self, names):
+        """(query, candidate, shared trigrams) of every known name sharing a trigram with a query,
+        ordered by query then most shared first, and the trigram count of each query"""
+        rows, codes = trigram_codes(names)
+        n_grams = np.bincount(rows, minlength=len(names))
+        pos = np.minimum(np.searchsorted(self.grams, codes), max(len(self.grams) - 1, 0))
+        known = (self.grams[pos] == codes) if len(self.grams) else np.zeros(len(codes), dtype=bool)
+        rows, pos = rows[known], pos[known]
+        starts, counts = self.offsets[pos], self.offsets[pos + 1] - self.offsets[pos]
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        keys = np.repeat(rows, counts) * len(self.names) + self.postings[np.repeat(starts, counts) + offsets]
+        keys, shared = np.unique(keys, return_counts=True)
+        query, candidate = np.divmod(keys, max(len(self.names), 1))
+        order = np.lexsort((candidate, -shared, query))
+        return query[order], candidate[order], shared[order], n_grams
+
+    def query_table(self, names):
+        """(peq, lengths) of the names for bit_distances; characters outside the alphabet match nothing"""
+        chars, lengths = char_matrix(names)
+        ids = np.minimum(np.searchsorted(self.alphabet, chars), max(len(self.alphabet) - 1, 0))
+        ids = np.where(self.alphabet[ids] == chars, ids, len(self.alphabet)) if len(self.alphabet) else ids
+        rows, cols = np.nonzero(np.arange(chars.shape[1]) < np.minimum(lengths, 63)[:, None])
+        peq = np.zeros((len(names), len(self.alphabet) + 1), dtype=np.uint64)
+        np.bitwise_or.at(peq, (rows, ids[rows, cols]), np.uint64(1) << cols.astype(np.uint64))
+        peq[:, len(self.alphabet)] = 0
+        return peq, lengths
+
+    def distances(self, names, table, query, candidate):
+        """Edit distance of each (query, candidate) pair, MAX_PAIRS pairs at a time"""
+        peq, lengths = table
+        d = np.empty(len(query), dtype=np.int64)
+        for start in range(0, len(query), MAX_PAIRS):
+            q, c = query[start:start + MAX_PAIRS], candidate[start:start + MAX_PAIRS]
+            short = lengths[q] < 64
+            d[start:start + MAX_PAIRS][short] = bit_distances(
+                peq, lengths, q[short], self.char_ids[c[short]], self.lengths[c[short]])
+            d[start:start + MAX_PAIRS][~short] = [
+                levenshtein(a, b, np.inf) for a, b in zip(names[q[~short]], self.names[c[~short]])]
+        return d
+
+    def nearest(self, names):
+        """(closest known name, edit distance) arrays; None / -1 for empty names.
+
+        Each distinct name is searched once. Candidates are checked in rounds
+        of growing size, best-ranked first, skipping those whose bound cannot
+        beat the best distance so far; names that a known name sharing no
+        trigram could still beat are then compared with every known name."""
+        codes, names = pd.factorize(np.array([n if isinstance(n, str) else "" for n in names], dtype=object))
+        names = np.asarray(names, dtype=object)
+        table = self.query_table(names)
+        query, candidate, shared, n_grams = self.candidates(names)
+        rank = np.arange(len(query)) - np.searchsorted(query, query)
+        # lower bounds of the distance: trigrams missing from the candidate, and the length difference
+        bound = np.maximum((n_grams[query] - shared) / Q, np.abs(self.lengths[candidate] - table[1][query]))
+        best = np.full(len(names), np.inf)
+        best_candidate = np.full(len(names), -1, dtype=np.int64)
+
+        def update(q, c, d, priority):
+            first = np.lexsort((priority, d, q))   # per query: smallest distance, then best priority
+            first = first[np.r_[True, q[first][1:] != q[first][:-1]]] if len(first) else first
+            better = d[first] < best[q[first]]
+            best[q[first][better]] = d[first][better]
+            best_candidate[q[first][better]] = c[first][better]
+
+        lo, hi = 0, ROUND_SIZE
+        while (rank >= lo).any():
+            sel = np.flatnonzero((rank >= lo) & (rank < hi) & (bound < best[query]))
+            lo, hi = hi, hi * 4
+            update(query[sel], candidate[sel], self.distances(names, table, query[sel], candidate[sel]), sel)
+        rest = np.flatnonzero((names != "") & (n_grams / Q < best))
+        step = max(MAX_PAIRS // max(len(self.names), 1), 1)
+        for start in range(0, len(rest), step):
+            chunk = rest[start:start + step]
+            rows, c = np.nonzero(np.abs(self.lengths - table[1][chunk, None]) < best[chunk, None])
+            update(chunk[rows], c, self.distances(names, table, chunk[rows], c), c)
+
+        found = best_candidate >= 0
+        closest = np.full(len(names), None, dtype=object)
+        closest[found] = self.names[best_candidate[found]]
+        return closest[codes], np.where(found, best, -1).astype(np.int64)[codes]
+
+
+if __name__ == "__main__":
+    from name_index import load_name_index
+    neighbors = NameNeighbors(load_name_index().binomials)
+    for name, (match, d) in zip(sys.argv[1:], zip(*neighbors.nearest(sys.argv[1:]))):
+        print(f"{name} -> {match} (distance {d})")
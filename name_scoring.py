@@ -0,0 +1,365 @@
+"""Score generated binomials: Latin format, family classification and semantic consistency.
+
+Each model profile in scoring_profiles.py only supplies its tables
+(description keywords, Latin roots and their meanings, extra match rules,
+the genus -> family index) to a NameScorer. The scorer compiles every term
+of a column into one trie regex, so a single scan per column finds every
+term that occurs as a substring, and scores a whole DataFrame of
+(description, family, generated_name) rows with joins instead of per-row
+loops.
+
+    python accuracy-gpt2.py [GENERATIONS]   .csv or .parquet with the columns below
+"""
+import re
+import numpy as np
+import pandas as pd
+from binomial.species_table import read_species
+from genus_index import GenusFamilyIndex
+
+GENERATION_COLUMNS = ["description", "family", "generated_name"]
+BACKEND_RESULTS_PATH = "data/backend_results.parquet"   # written by evaluate_backends.py
+GENUS_REGEX = r"[A-Z][a-z]+"
+EPITHET_REGEX = r"[a-z]+"
+NEAR_COPY_DISTANCE = 2
+SEMANTIC_CUTOFFS = [("≥", 0.5), ("≥", 0.75)]   # (">" or "≥", score) lines of the detailed statistics
+
+
+def trie_regex(terms):
+    """Regex matching the longest of `terms` that starts at the current position"""
+    trie = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def pattern(node):
+        branches = [re.escape(ch) + pattern(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        group = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            return ("(?:" + group + ")?") if len(branches) == 1 and len(group) > 1 else group + "?"
+        return group
+
+    return pattern(trie)
+
+
+class TermMatcher:
+    """Every term that occurs in each text, as `term in text` would find it, in one regex pass.
+
+    The regex is a zero-width lookahead tried at every position and
+    returns the longest term starting there; the shorter terms starting at
+    the same position are exactly the prefixes of that term.
+    """
+
+    def __init__(self, terms):
+        self.terms = sorted({t for t in terms if t})
+        self.regex = re.compile("(?=(" + trie_regex(self.terms) + "))") if self.terms else None
+        self.prefixes = {t: [p for p in self.terms if t.startswith(p)] for t in self.terms}
+
+    def find(self, texts):
+        """DataFrame of (row, term) for every term found in the texts, one row per pair"""
+        if self.regex is None:
+            return pd.DataFrame({"row": pd.Series(dtype=np.int64), "term": pd.Series(dtype=object)})
+        found = texts.str.findall(self.regex).explode().dropna()
+        hits = pd.DataFrame({"row": found.index.to_numpy(np.int64), "term": found.map(self.prefixes).to_numpy()})
+        return hits.explode("term").drop_duplicates(ignore_index=True)
+
+
+def lists_by_row(rows, values, n):
+    """[values of row 0, values of row 1, ...], in the given order, with empty lists for absent rows"""
+    out = [[] for _ in range(n)]
+    for row, value in zip(rows.tolist(), values.tolist()):
+        out[row].append(value)
+    return out
+
+
+def split_names(names):
+    """(cleaned name, genus, epithet, word count) of generated names; markdown asterisks are dropped"""
+    names = names.fillna("").astype(str).str.replace("*", "", regex=False).str.strip()
+    parts = names.str.split()
+    return names, parts.str[0].fillna(""), parts.str[1].fillna(""), parts.str.len()
+
+
+def validate_latin_format(names):
+    """(valid, message) Series of the Latin binomial format checks"""
+    _, genus, species, n_words = split_names(names)
+    return latin_format(genus, species, n_words)
+
+
+def latin_format(genus, species, n_words):
+    checks = [
+        (n_words != 2, "Expected 2 words, got " + n_words.astype(str)),
+        (~genus.str[:1].str.isupper(), "Genus '" + genus + "' should start with capital letter"),
+        (~genus.str.fullmatch(GENUS_REGEX), "Genus '" + genus + "' doesn't match Latin pattern"),
+        (~species.str.islower(), "Species epithet '" + species + "' should be all lowercase"),
+        (~species.str.fullmatch(EPITHET_REGEX), "Species epithet '" + species + "' doesn't match Latin pattern"),
+    ]
+    conditions = [c.fillna(True).to_numpy(bool) for c, _ in checks]
+    message = np.select(conditions, [m.to_numpy(object) for _, m in checks], "Valid Latin binomial")
+    return pd.Series(~np.logical_or.reduce(conditions), index=genus.index), pd.Series(message, index=genus.index)
+
+
+class NameScorer:
+    """Scores generated names against one set of keyword / Latin-root / family tables.
+
+    keywords: {category: [description word, ...]}
+    latin_meanings: {Latin root: [meaning, ...]}; a match is a root found in
+        the epithet whose meaning is found in the description
+    genus_index: GenusFamilyIndex (see genus_index.py), or a {family: [genus, ...]} dict
+    rules: [(description words, epithet terms, label)]; a rule matches once
+        when any of its words and any of its terms are present
+    skip_credited: a rule with a single epithet term is skipped when that
+        term already appears in the label of an earlier match of the row
+    score: "ratio" = matches / description keywords (capped at 1);
+        "stepped" = 0.5 + 0.25 per match (capped at 1), 0 without matches.
+        Rows without description keywords score 0.5 either way.
+    name_index: optional NameIndex (see name_index.py); adds the novelty
+        columns name_known, genus_known and epithet_known
+    neighbors: optional NameNeighbors (see name_neighbors.py); adds the
+        closest known species and its edit distance (nearest_species,
+        nearest_distance)
+    """
+
+    def __init__(self, keywords, latin_meanings, genus_index, rules=(), skip_credited=False, score="ratio",
+                 name_index=None, neighbors=None):
+        self.keywords = pd.DataFrame(
+            [(word, category) for category, words in keywords.items() for word in words],
+            columns=["keyword", "category"]).reset_index(names="order")
+        self.meanings = pd.DataFrame(
+            [(root, meaning) for root, meanings in latin_meanings.items() for meaning in meanings],
+            columns=["root", "meaning"]).reset_index(names="order")
+        self.rules = pd.DataFrame(
+            [(i, word, term, label) for i, (words, terms, label) in enumerate(rules) for word in words for term in terms],
+            columns=["rule", "word", "term", "label"])
+        self.rules["order"] = len(self.meanings) + self.rules["rule"]
+        self.rules["key"] = self.rules["term"].where(self.rules.groupby("rule")["term"].transform("size") == 1)
+        self.meanings["label"] = "'" + self.meanings["root"] + "' → '" + self.meanings["meaning"] + "'"
+        labels = pd.concat([self.meanings[["order", "label"]], self.rules[["order", "label"]].drop_duplicates()])
+        # (key, cover): the match at order `cover` has a label containing the rule key
+        self.covers = pd.DataFrame(
+            [(key, order) for key in self.rules["key"].dropna().unique()
+             for order, label in zip(labels["order"], labels["label"]) if key in label],
+            columns=["key", "cover"])
+        if isinstance(genus_index, dict):
+            genus_index = GenusFamilyIndex.from_mapping(genus_index)
+        self.genus_index = genus_index
+        self.name_index = name_index
+        self.neighbors = neighbors
+        self.skip_credited = skip_credited
+        self.score = score
+        self.description_terms = TermMatcher(
+            list(self.keywords["keyword"]) + list(self.meanings["meaning"]) + list(self.rules["word"]))
+        self.epithet_terms = TermMatcher(list(self.meanings["root"]) + list(self.rules["term"]))
+
+    def validate_family(self, family, genus):
+        """(valid, message) Series; valid is None for families missing from the index"""
+        family = family.fillna("").astype(str)
+        known = self.genus_index.family_ids(family) >= 0
+        member = self.genus_index.belongs(genus, family)
+        valid = pd.Series(np.where(known, member, None), index=family.index, dtype=object)
+        wrong = np.flatnonzero(known & ~member)
+        listed = pd.Series("", index=family.index, dtype=object)
+        listed.iloc[wrong] = [str(fams) if fams else "" for fams in map(self.genus_index.families_of, genus.iloc[wrong])]
+        message = np.select(
+            [~known, member, listed != ""],
+            [("Family '" + family + "' not in database").to_numpy(object),
+             ("✓ Genus '" + genus + "' correctly belongs to " + family).to_numpy(object),
+             ("✗ Genus '" + genus + "' belongs to " + listed + ", not " + family).to_numpy(object)],
+            ("✗ Genus '" + genus + "' not found in " + family).to_numpy(object))
+        return valid, pd.Series(message, index=family.index)
+
+    def semantic_matches(self, descriptions, epithets):
+        """(description keywords, matches) as DataFrames of (row, order, ...) for each row"""
+        desc_hits = self.description_terms.find(descriptions.fillna("").astype(str).str.lower())
+        epithet_hits = self.epithet_terms.find(epithets.str.lower())
+
+        keywords = desc_hits.merge(self.keywords, left_on="term", right_on="keyword").sort_values(["row", "order"])
+        meant = epithet_hits.merge(self.meanings, left_on="term", right_on="root")
+        meant = meant.merge(desc_hits, left_on=["row", "meaning"], right_on=["row", "term"])
+
+        fired = desc_hits.merge(self.rules, left_on="term", right_on="word")
+        fired = fired[["row", "rule", "term_y", "label", "order", "key"]].rename(columns={"term_y": "term"})
+        fired = fired.merge(epithet_hits, on=["row", "term"]).drop_duplicates(["row", "rule"])
+        if self.skip_credited and len(fired):
+            earlier = pd.concat([meant[["row", "order"]], fired[["row", "order"]]]).rename(columns={"order": "cover"})
+            covered = fired[["row", "order", "key"]].merge(self.covers, on="key").merge(earlier, on=["row", "cover"])
+            covered = covered[covered["cover"] < covered["order"]]
+            fired = fired[~pd.MultiIndex.from_frame(fired[["row", "order"]]).isin(
+                pd.MultiIndex.from_frame(covered[["row", "order"]]))]
+        matches = pd.concat([meant[["row", "order", "label"]], fired[["row", "order", "label"]]])
+        return keywords, matches.sort_values(["row", "order"], kind="stable")
+
+    def score_frame(self, df):
+        """One row of scores per (description, family, generated_name) row of df"""
+        df = df.reset_index(drop=True)
+        names, genus, epithet, n_words = split_names(df["generated_name"])
+        format_valid, format_msg = latin_format(genus, epithet, n_words)
+        family_valid, family_msg = self.validate_family(df["family"], genus)
+        keywords, matches = self.semantic_matches(df["description"], epithet)
+
+        n_keywords = np.bincount(keywords["row"].to_numpy(np.int64), minlength=len(df))
+        n_matches = np.bincount(matches["row"].to_numpy(np.int64), minlength=len(df))
+        if self.score == "stepped":
+            score = np.where(n_matches > 0, np.minimum(0.5 + 0.25 * n_matches, 1.0), 0.0)
+        else:
+            score = np.minimum(n_matches / np.maximum(n_keywords, 1), 1.0)
+        score = np.where(n_keywords > 0, score, 0.5)
+
+        results = pd.DataFrame({
+            "id": np.arange(1, len(df) + 1),
+            "description": df["description"],
+            "family": df["family"],
+            "generated_name": names,
+            "format_valid": format_valid,
+            "format_msg": format_msg,
+            "family_valid": family_valid,
+            "family_msg": family_msg,
+            "semantic_score": score,
+            "semantic_matches": lists_by_row(matches["row"], matches["label"], len(df)),
+            "description_keywords": lists_by_row(keywords["row"], keywords["keyword"], len(df)),
+        })
+        if self.name_index is not None:
+            results["name_known"], results["genus_known"], results["epithet_known"] = self.name_index.check(genus, epithet)
+        if self.neighbors is not None:
+            results["nearest_species"], results["nearest_distance"] = self.neighbors.nearest(
+                (genus + " " + epithet).str.strip())
+        return results
+
+
+def load_generations(path, backend=None):
+    """(description, family, generated_name) table from a .csv or .parquet file.
+
+    A results file of evaluate_backends.py holds several backends; only
+    the rows of `backend` are kept. Files without a backend column are
+    taken whole.
+    """
+    df = read_species(path, columns=GENERATION_COLUMNS + ["backend"])
+    if backend is not None and "backend" in df:
+        df = df[df["backend"] == backend]
+    return df[GENERATION_COLUMNS].reset_index(drop=True)
+
+
+def summarize(results):
+    """Metrics of scored rows; family_accuracy counts only rows whose family is in the genus index"""
+    total = len(results)
+    checked = int(results["family_valid"].notna().sum())
+    metrics = {
+        "format_accuracy": results["format_valid"].sum() / total if total else 0,
+        "family_accuracy": results["family_valid"].eq(True).sum() / checked if checked else 0,
+        "family_coverage": checked / total if total else 0,
+        "unknown_families": total - checked,
+        "semantic_accuracy": results["semantic_score"].mean() if total else 0,
+    }
+    if "name_known" in results:
+        metrics["novel_name_rate"] = 1 - results["name_known"].mean() if total else 0
+        metrics["novel_genus_rate"] = 1 - results["genus_known"].mean() if total else 0
+        metrics["novel_epithet_rate"] = 1 - results["epithet_known"].mean() if total else 0
+    if "nearest_distance" in results:
+        distance = results["nearest_distance"][results["nearest_distance"] >= 0]
+        metrics["near_copy_rate"] = distance.between(1, NEAR_COPY_DISTANCE).sum() / total if total else 0
+        metrics["mean_nearest_distance"] = distance.mean() if len(distance) else 0
+    return metrics
+
+
+def print_case(r):
+    print(f"\n{'='*100}")
+    print(f"Test Case #{r.id}")
+    print(f"{'='*100}")
+    print(f"Description: {r.description}")
+    print(f"Family: {r.family}")
+    print(f"Generated Name: {r.generated_name}")
+
+    print(f"\n[1] Latin Format Validation:")
+    print(f"    Status: {'✓ PASS' if r.format_valid else '✗ FAIL'}")
+    print(f"    {r.format_msg}")
+
+    print(f"\n[2] Family Classification:")
+    print(f"    Status: {'✓ PASS' if r.family_valid else ('? UNKNOWN' if r.family_valid is None else '✗ FAIL')}")
+    print(f"    {r.family_msg}")
+
+    print(f"\n[3] Semantic Consistency:")
+    print(f"    Score: {r.semantic_score:.2%}")
+    print(f"    Description Keywords: {r.description_keywords}")
+    if r.semantic_matches:
+        print(f"    Semantic Matches Found:")
+        for match in r.semantic_matches:
+            print(f"      - {match}")
+    else:
+        print(f"    No direct semantic matches found")
+
+    if hasattr(r, "name_known"):
+        print(f"\n[4] Novelty:")
+        if r.name_known:
+            print(f"    ✗ '{r.generated_name}' is a known species")
+        else:
+            print(f"    ✓ New binomial (genus {'known' if r.genus_known else 'new'}, "
+                  f"epithet {'known' if r.epithet_known else 'new'})")
+    if getattr(r, "nearest_species", None):
+        print(f"    Closest known species: {r.nearest_species} ({r.nearest_distance} edits)")
+
+
+def evaluate_generated_results(test_data, scorer, show_cases=True, semantic_cutoffs=SEMANTIC_CUTOFFS):
+    """Score a list of dicts or a DataFrame of generations and print the report; returns (results, metrics)"""
+    results = scorer.score_frame(pd.DataFrame(test_data, columns=GENERATION_COLUMNS))
+    metrics = summarize(results)
+    total = len(results)
+
+    print("=" * 100)
+    print("EVALUATION OF GENERATED SCIENTIFIC NAMES")
+    print("=" * 100)
+    if show_cases:
+        for r in results.itertuples(index=False):
+            print_case(r)
+
+    format_correct = int(results["format_valid"].sum())
+    family_correct = int(results["family_valid"].eq(True).sum())
+    family_checked = total - metrics["unknown_families"]
+    format_accuracy = metrics["format_accuracy"]
+    family_accuracy = metrics["family_accuracy"]
+    semantic_accuracy = metrics["semantic_accuracy"]
+    fmt = results["format_valid"]
+    fam = results["family_valid"].eq(True)
+    wrong_family = results["family_valid"].eq(False)   # unknown families are neither right nor wrong
+    sem = results["semantic_score"]
+
+    print(f"\n{'='*100}")
+    print("EVALUATION SUMMARY")
+    print(f"{'='*100}")
+    print(f"Total Test Cases: {total}")
+    print(f"\n┌{'─'*96}┐")
+    print(f"│ {'Metric':<40} │ {'Accuracy':<20} │ {'Passed/Total':<30} │")
+    print(f"├{'─'*96}┤")
+    print(f"│ {'1. Latin Format Accuracy':<40} │ {f'{format_accuracy:.2%}':<20} │ {f'{format_correct}/{total}':<30} │")
+    print(f"│ {'2. Family Classification Accuracy':<40} │ {f'{family_accuracy:.2%}':<20} │ {f'{family_correct}/{family_checked}':<30} │")
+    print(f"│ {'3. Semantic Consistency Score':<40} │ {f'{semantic_accuracy:.2%}':<20} │ {f'Avg: {semantic_accuracy:.3f}':<30} │")
+    print(f"└{'─'*96}┘")
+
+    print(f"\nDetailed Statistics:")
+    print(f"  - Families in the genus index: {family_checked} / {total} ({metrics['family_coverage']:.2%}); "
+          f"{metrics['unknown_families']} not in database, left out of the family accuracy")
+    print(f"  - Perfect scores (all 3 pass): {(fmt & fam & (sem > 0.5)).sum()} / {total}")
+    print(f"  - Format only: {(fmt & wrong_family).sum()} / {total}")
+    print(f"  - Family only: {(~fmt & fam).sum()} / {total}")
+    print(f"  - Format + Family correct: {(fmt & fam).sum()} / {total}")
+    for op, cutoff in semantic_cutoffs:
+        passed = sem > cutoff if op == ">" else sem >= cutoff
+        print(f"  - Semantic score {op} {cutoff}: {passed.sum()} / {total}")
+
+    if "name_known" in results or "nearest_distance" in results:
+        print(f"\nNovelty (vs {len(scorer.name_index or scorer.neighbors)} known species):")
+    if "name_known" in results:
+        known, genus, epithet = results["name_known"], results["genus_known"], results["epithet_known"]
+        print(f"  - Novel binomials: {(~known).sum()} / {total} ({metrics['novel_name_rate']:.2%})")
+        print(f"  - Known species (copied): {known.sum()} / {total}")
+        print(f"  - New name on a known genus: {(~known & genus).sum()} / {total}")
+        print(f"  - New genus: {(~genus).sum()} / {total} ({metrics['novel_genus_rate']:.2%})")
+        print(f"  - New epithet: {(~epithet).sum()} / {total} ({metrics['novel_epithet_rate']:.2%})")
+    if "nearest_distance" in results:
+        distance = results["nearest_distance"]
+        print(f"  - Near copies (1-{NEAR_COPY_DISTANCE} edits from a known species): "
+              f"{distance.between(1, NEAR_COPY_DISTANCE).sum()} / {total} ({metrics['near_copy_rate']:.2%})")
+        print(f"  - Mean edit distance to the closest known species: {metrics['mean_nearest_distance']:.2f}")
+
+    return results, metrics
@@ -0,0 +1,90 @@
+import time
+import asyncio
+import threading
+
+
+class TokenBucket:
+    """Token bucket shared by threads and asyncio tasks.
+
+    acquire() reserves tokens under a lock and sleeps outside it, so the
+    bucket may go into debt; callers then wait until their reservation is
+    covered. rate is in tokens per second.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, n):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= n
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self, n=1):
+        wait = self._reserve(n)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, n=1):
+        wait = self._reserve(n)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class RateLimiter:
+    """Global requests/sec limit plus an optional tokens/min budget.
+
+    Usable from worker threads (acquire) and asyncio tasks
+    (acquire_async). Callers pass an estimate of the tokens a request
+    will use and may settle the difference once the real usage is known.
+    """
+
+    def __init__(self, requests_per_sec, tokens_per_min=None):
+        self.requests = TokenBucket(requests_per_sec)
+        self.tokens = TokenBucket(tokens_per_min / 60.0, tokens_per_min) if tokens_per_min else None
+        self.count = 0
+        self.first = None
+        self.last = None
+        self._lock = threading.Lock()
+
+    def _waits(self, tokens):
+        wait = self.requests._reserve(1)
+        if self.tokens is not None and tokens:
+            wait = max(wait, self.tokens._reserve(tokens))
+        return wait
+
+    def _record(self):
+        with self._lock:
+            now = time.monotonic()
+            self.count += 1
+            if self.first is None:
+                self.first = now
+            self.last = now
+
+    def acquire(self, tokens=0):
+        wait = self._waits(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        self._record()
+
+    async def acquire_async(self, tokens=0):
+        wait = self._waits(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self._record()
+
+    def settle(self, estimated, actual):
+        """Correct the token budget after a response reports its real usage"""
+        if self.tokens is not None and actual is not None:
+            self.tokens._reserve(actual - estimated)
+
+    def achieved_qps(self):
+        if self.count < 2 or self.last == self.first:
+            return 0.0
+        return (self.count - 1) / (self.last - self.first)
@@ -0,0 +1,135 @@
+"""Scoring tables of the evaluated models.
+
+Each profile is a set of description keywords, Latin roots with their
+meanings and extra match rules for a NameScorer. Families are checked against the genus
+-> family index of data/species_list.csv (genus_index.py), and novelty and
+the closest known species (name_index.py, name_neighbors.py) against the
+names of data/species_with_description_fixed.csv; those indexes are built
+or loaded only when a scorer is made.
+"""
+from genus_index import load_genus_index
+from name_index import load_name_index
+from name_neighbors import NameNeighbors
+from name_scoring import NameScorer
+
+GPT2_DESCRIPTION_KEYWORDS = {
+    "size": ["large", "tiny", "small", "big", "giant", "fluffy", "sleek", "gentle"],
+    "color": ["brown", "gray", "grey", "colorful", "black", "white", "golden", "red",
+              "green", "dark", "bright", "snow"],
+    "habitat": ["desert", "forest", "water", "garden", "pond", "barn", "bamboo",
+                "waterfall", "rock"],
+    "behavior": ["fast", "slow", "silent", "shy", "curious", "running", "flight",
+                 "hunts", "plays", "imitate", "curls"],
+    "features": [],
+}
+
+GPT2_LATIN_MEANINGS = {
+    "parvi": ["small", "little"],
+    "longicaudatus": ["long", "tail"],
+    "pygargus": ["striped", "marked"],
+    "chrysocomus": ["golden", "yellow"],
+    "hesperidesus": ["western", "evening"],
+    "lutrilla": ["otter", "water"],
+    "nirostralis": ["black", "dark"],
+    "seleniticus": ["moon", "lunar", "water"],
+    "temnodon": ["cutting", "sharp"],
+    "sunbatheus": ["sun", "warm"],
+    "aquiferosus": ["water", "aquatic"],
+    "tephrocyonus": ["gray", "ashy"],
+    "stenolophus": ["narrow", "slender"],
+    "stoichiardus": ["row", "line"],
+}
+
+# (description words, epithet fragments, label)
+GPT2_SEMANTIC_RULES = [
+    (["long"], ["long"], "'long' appears in both"),
+    (["black"], ["nigr", "niro"], "'black' (nigr/niro) matches"),
+    (["water"], ["aqui", "seleni"], "'water' (aqui/seleni) matches"),
+    (["golden"], ["chryso"], "'golden' (chryso) matches"),
+    (["sun"], ["sun"], "'sun' matches"),
+]
+
+GPT2_SEMANTIC_CUTOFFS = [(">", 0.5)]
+
+GEMINI_DESCRIPTION_KEYWORDS = {
+    "size": ["large", "tiny", "small", "big", "giant", "fluffy", "sleek", "majestic",
+             "long-necked", "powerful"],
+    "color": ["brown", "gray", "grey", "colorful", "black", "white", "golden", "red",
+              "green", "dark", "bright", "blue", "silvery", "striped"],
+    "habitat": ["desert", "forest", "water", "garden", "pond", "barn", "bamboo",
+                "waterfall", "rock", "savanna", "riverbank", "cave", "dam"],
+    "behavior": ["fast", "slow", "silent", "shy", "curious", "running", "flight",
+                 "hunts", "plays", "imitate", "curls", "agile", "soaring", "grazing",
+                 "hopping", "hooting", "singing", "burrowing", "flying", "building",
+                 "slides", "changes", "reaching"],
+    "features": ["mane", "tail", "eyes", "eyesight", "claws", "feathers", "keen",
+                 "venomous", "rattling", "round", "leaves", "nuts"],
+}
+
+GEMINI_LATIN_MEANINGS = {
+    "crinita": ["mane", "hair", "flowing"],
+    "nucifraga": ["nut", "gather"],
+    "ludicra": ["playful", "play", "game"],
+    "acuta": ["sharp", "keen", "acute"],
+    "vittatus": ["striped", "banded"],
+    "sonans": ["sound", "rattling", "noise"],
+    "versicolor": ["color", "changing", "varied"],
+    "saltator": ["jumping", "hopping", "leap"],
+    "oculata": ["eye", "eyes", "vision"],
+    "alta": ["tall", "high", "long"],
+    "aedificans": ["building", "construct"],
+    "caeruleus": ["blue", "azure"],
+    "fossor": ["digging", "burrowing"],
+    "argenteus": ["silver", "silvery"],
+    "speluncae": ["cave", "cavern"],
+    "parvi": ["small", "little"],
+    "longicaudatus": ["long", "tail"],
+    "pygargus": ["striped", "marked"],
+    "chrysocomus": ["golden", "yellow"],
+    "aquiferosus": ["water", "aquatic"],
+    "tephrocyonus": ["gray", "ashy"],
+}
+
+# description word -> Latin epithet, credited once per epithet
+GEMINI_DIRECT_MATCHES = {
+    "mane": "crinita",
+    "nut": "nucifraga",
+    "play": "ludicra",
+    "keen": "acuta",
+    "sharp": "acuta",
+    "stripe": "vittatus",
+    "sound": "sonans",
+    "rattle": "sonans",
+    "color": "versicolor",
+    "change": "versicolor",
+    "jump": "saltator",
+    "hop": "saltator",
+    "eye": "oculata",
+    "tall": "alta",
+    "high": "alta",
+    "long": "alta",
+    "build": "aedificans",
+    "blue": "caeruleus",
+    "dig": "fossor",
+    "burrow": "fossor",
+    "silver": "argenteus",
+    "cave": "speluncae",
+}
+
+
+def gpt2_scorer(genus_index=None, name_index=None):
+    """Scorer of accuracy-gpt2.py"""
+    genus_index = load_genus_index() if genus_index is None else genus_index
+    name_index = load_name_index() if name_index is None else name_index
+    return NameScorer(GPT2_DESCRIPTION_KEYWORDS, GPT2_LATIN_MEANINGS, genus_index, GPT2_SEMANTIC_RULES,
+                      score="ratio", name_index=name_index, neighbors=NameNeighbors(name_index.binomials))
+
+
+def gemini_scorer(genus_index=None, name_index=None):
+    """Scorer of accuracy-gemini.py"""
+    genus_index = load_genus_index() if genus_index is None else genus_index
+    name_index = load_name_index() if name_index is None else name_index
+    rules = [([word], [latin], f"'{word}' → '{latin}' (direct)") for word, latin in GEMINI_DIRECT_MATCHES.items()]
+    return NameScorer(GEMINI_DESCRIPTION_KEYWORDS, GEMINI_LATIN_MEANINGS, genus_index, rules,
+                      skip_credited=True, score="stepped", name_index=name_index,
+                      neighbors=NameNeighbors(name_index.binomials))
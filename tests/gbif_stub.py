@@ -0,0 +1,83 @@
+"""Local aiohttp stand-in for the GBIF species API, serving a canned taxonomy.
+
+Serves /species/match?name= and /species/{key}/children?limit=&offset=
+(paged with endOfRecords) for GbifCrawler(base_url=...). `failures` makes
+the first requests of a path answer with an error status first.
+"""
+from aiohttp import web
+
+# key -> (rank, canonicalName, family, child keys)
+TAXA = {
+    1: ("FAMILY", "Canidae", "Canidae", [10, 11]),
+    10: ("GENUS", "Canis", "Canidae", [100, 101, 102]),
+    11: ("GENUS", "Vulpes", "Canidae", [110]),
+    100: ("SPECIES", "Canis lupus", "Canidae", [1000]),
+    101: ("SPECIES", "Canis latrans", "Canidae", []),
+    102: ("SPECIES", "Canis aureus", "Canidae", []),
+    110: ("SPECIES", "Vulpes vulpes", "Canidae", []),
+    1000: ("SUBSPECIES", "Canis lupus dingo", "Canidae", []),
+    2: ("FAMILY", "Ursidae", "Ursidae", [20]),
+    20: ("GENUS", "Ursus", "Ursidae", [200]),
+    200: ("SPECIES", "Ursus arctos", "Ursidae", []),
+}
+
+
+def taxon(key):
+    rank, name, family, _ = TAXA[key]
+    return {"key": key, "rank": rank, "scientificName": f"{name} L.", "canonicalName": name,
+            "authorship": "L.", "family": family}
+
+
+class GbifStub:
+    def __init__(self, taxa=TAXA, failures=None, status=503):
+        self.taxa = taxa
+        self.failures = dict(failures or {})
+        self.status = status
+        self.requests = []
+        self.url = None
+        self._runner = None
+
+    def _failing(self, request):
+        self.requests.append(request.path_qs)
+        if self.failures.get(request.path, 0) > 0:
+            self.failures[request.path] -= 1
+            return web.json_response({"error": "busy"}, status=self.status, headers={"Retry-After": "0"})
+        return None
+
+    async def match(self, request):
+        failed = self._failing(request)
+        if failed is not None:
+            return failed
+        for key, (rank, name, _, _) in self.taxa.items():
+            if name == request.query.get("name"):
+                return web.json_response({"usageKey": key, "rank": rank, "matchType": "EXACT"})
+        return web.json_response({"matchType": "NONE"})
+
+    async def children(self, request):
+        failed = self._failing(request)
+        if failed is not None:
+            return failed
+        key = int(request.match_info["key"])
+        if key not in self.taxa:
+            return web.json_response({"error": "not found"}, status=404)
+        limit = int(request.query.get("limit", 20))
+        offset = int(request.query.get("offset", 0))
+        keys = self.taxa[key][3]
+        page = keys[offset:offset + limit]
+        return web.json_response({"offset": offset, "limit": limit, "endOfRecords": offset + limit >= len(keys),
+                                  "results": [taxon(k) for k in page]})
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_get("/species/match", self.match)
+        app.router.add_get("/species/{key}/children", self.children)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._runner.cleanup()
@@ -0,0 +1,75 @@
+"""Local stand-in for an OpenAI-compatible chat completions endpoint.
+
+POST /chat/completions answers epithet prompts from a fixed meaning table:
+a JSON object for batch prompts (response_format json_object), wrapped
+in a code fence when fenced=True and leaving out the epithets in `drop`,
+and a bare phrase for single-epithet prompts. Every request is recorded.
+"""
+import re
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MEANINGS = {
+    "lupus": "wolf",
+    "rufus": "red-colored",
+    "sinensis": "from China",
+    "andersoni": "named after Anderson",
+    "latrans": "barking",
+}
+
+
+class ChatStub:
+    def __init__(self, meanings=MEANINGS, drop=(), fenced=False):
+        self.meanings = meanings
+        self.drop = set(drop)
+        self.fenced = fenced
+        self.requests = []
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                reply = json.dumps(stub.complete(body)).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(reply)))
+                self.end_headers()
+                self.wfile.write(reply)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def answer(self, body):
+        prompt = body["messages"][-1]["content"]
+        if body.get("response_format", {}).get("type") == "json_object":
+            keys = re.findall(r"^\s*- (\S+)$", prompt, flags=re.M)
+            with self._lock:
+                self.requests.append(keys)
+            text = json.dumps({k: self.meanings[k] for k in keys if k in self.meanings and k not in self.drop})
+            return f"```json\n{text}\n```" if self.fenced else text
+        epithet = re.search(r"epithet '([^']+)'", prompt).group(1)
+        with self._lock:
+            self.requests.append(epithet)
+        return self.meanings.get(epithet, "unknown meaning")
+
+    def complete(self, body):
+        content = self.answer(body)
+        return {
+            "id": "chatcmpl-stub", "object": "chat.completion", "created": 0, "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+        }
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,16 @@
+import threading
+from epithet_cache import EpithetCache
+
+
+def test_concurrent_failures_count_every_attempt(tmp_path):
+    cache = EpithetCache(str(tmp_path / "cache.jsonl"))
+    threads = [threading.Thread(target=lambda: [cache.set_failure("lupus", TimeoutError("slow")) for _ in range(50)])
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert cache.failures["lupus"]["attempts"] == 400
+    cache.close()
+    reloaded = EpithetCache(str(tmp_path / "cache.jsonl"))
+    assert reloaded.failures["lupus"]["attempts"] == 400 and reloaded.failures["lupus"]["error"] == "TimeoutError"
@@ -0,0 +1,103 @@
+import os
+import sys
+import importlib
+import pytest
+import pandas as pd
+from openai import OpenAI
+from epithet_cache import EpithetCache
+from rate_limit import RateLimiter
+from openai_stub import ChatStub
+
+
+@pytest.fixture(scope="module")
+def module(tmp_path_factory):
+    # the script opens its epithet cache under data/ at import time
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("import"))
+    try:
+        sys.modules.pop("generate_epithet_description", None)
+        return importlib.import_module("generate_epithet_description")
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.fixture
+def stubbed(module, tmp_path, monkeypatch):
+    def start(**kwargs):
+        stub = ChatStub(**kwargs).__enter__()
+        monkeypatch.setattr(module, "client", OpenAI(api_key="test", base_url=stub.url, max_retries=0))
+        monkeypatch.setattr(module, "cache", EpithetCache(str(tmp_path / "cache.jsonl")))
+        monkeypatch.setattr(module, "limiter", RateLimiter(1000))
+        stubs.append(stub)
+        return stub
+    stubs = []
+    yield start
+    for stub in stubs:
+        stub.__exit__(None, None, None)
+
+
+def test_batches_with_single_epithet_fallback(module, stubbed):
+    stub = stubbed(drop={"sinensis"})
+    module.explain_all(["lupus", "Rufus", "sinensis", "andersoni", "latrans"], batch_size=3)
+    batches = [r for r in stub.requests if isinstance(r, list)]
+    assert sorted(map(sorted, batches)) == [["andersoni", "latrans"], ["lupus", "rufus", "sinensis"]]
+    assert [r for r in stub.requests if isinstance(r, str)] == ["sinensis"]
+    assert module.cache.data == {"lupus": "wolf", "rufus": "red-colored", "sinensis": "from China",
+                                 "andersoni": "named after Anderson", "latrans": "barking"}
+
+
+def test_cached_epithets_are_not_requested(module, stubbed):
+    stub = stubbed(fenced=True)
+    module.cache["lupus"] = "wolf"
+    module.explain_all(["lupus", "rufus"], batch_size=20)
+    assert stub.requests == [["rufus"]]
+    assert module.cache["rufus"] == "red-colored"
+
+
+def test_parse_batch_reply_keeps_requested_phrases(module):
+    reply = 'Sure:\n```json\n{"Lupus": "wolf", "rufus": "", "extra": "x", "latrans": 3}\n```'
+    assert module.parse_batch_reply(reply, ["lupus", "rufus", "latrans"]) == {"lupus": "wolf"}
+    assert module.parse_batch_reply("not json", ["lupus"]) == {}
+
+
+def test_stream_descriptions_writes_csv_and_parquet(module, stubbed, tmp_path):
+    stubbed()
+    source = tmp_path / "species.csv"
+    source.write_text("canonicalName,family\nCanis lupus,Canidae\nCanis latrans,Canidae\nUrsus sinensis,Ursidae\n",
+                      encoding="utf-8-sig")
+    out = str(tmp_path / "out.csv")
+    assert module.stream_descriptions(str(source), out, chunksize=2, output_parquet=str(tmp_path / "out.parquet")) == 3
+    df = pd.read_csv(out, encoding="utf-8-sig")
+    assert df.columns.tolist() == ["canonicalName", "family", "epithet", "description"]
+    assert df["description"].tolist() == ["a dog that resembles wolf", "a dog that resembles barking",
+                                          "a bear from China"]
+    assert pd.read_parquet(tmp_path / "out.parquet")["description"].tolist() == df["description"].tolist()
+
+
+def test_stream_descriptions_writes_header_without_rows(module, stubbed, tmp_path):
+    stubbed()
+    source = str(tmp_path / "empty.parquet")
+    pd.DataFrame({"canonicalName": pd.Series([], dtype=str), "family": pd.Series([], dtype=str)}).to_parquet(source)
+    out = str(tmp_path / "out.csv")
+    assert module.stream_descriptions(source, out) == 0
+    with open(out, encoding="utf-8-sig") as f:
+        assert f.read().splitlines() == ["canonicalName,family,epithet,description"]
+
+
+def test_stream_descriptions_leaves_no_output_on_error(module, stubbed, tmp_path, monkeypatch):
+    stubbed()
+    source = tmp_path / "species.csv"
+    source.write_text("canonicalName,family\nCanis lupus,Canidae\nUrsus sinensis,Ursidae\n", encoding="utf-8-sig")
+
+    def fail_second_chunk(df, meanings, calls=[]):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("boom")
+        return build(df, meanings)
+
+    build = module.build_descriptions
+    monkeypatch.setattr(module, "build_descriptions", fail_second_chunk)
+    with pytest.raises(RuntimeError):
+        module.stream_descriptions(str(source), str(tmp_path / "out.csv"), chunksize=1,
+                                   output_parquet=str(tmp_path / "out.parquet"))
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["cache.jsonl", "species.csv"]
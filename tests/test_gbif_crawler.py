@@ -0,0 +1,79 @@
+import asyncio
+from gbif_crawler import crawl_families
+from crawl_cache import ResponseCache, CrawlCheckpoint
+from http_client import RetryPolicy, HttpStats
+from gbif_stub import GbifStub
+
+FAST_RETRY = RetryPolicy(max_retries=3, base_delay=0.01, max_delay=0.01)
+
+
+def crawl(stub, families, **kwargs):
+    async def run():
+        async with stub:
+            return await crawl_families(families, base_url=stub.url, rate=1000, policy=FAST_RETRY, **kwargs)
+    return asyncio.run(run())
+
+
+def names(species):
+    return [s["canonicalName"] for s in species]
+
+
+def test_crawl_pages_children_in_depth_first_order():
+    stub = GbifStub()
+    species = crawl(stub, ["Canidae", "Ursidae", "Unknownidae"], page_limit=2)
+    assert names(species) == ["Canis lupus", "Canis latrans", "Canis aureus", "Vulpes vulpes", "Ursus arctos"]
+    assert species[0] == {"scientificName": "Canis lupus L.", "canonicalName": "Canis lupus",
+                          "authorship": "L.", "family": "Canidae"}
+    assert "/species/10/children?limit=2&offset=2" in stub.requests
+
+
+def test_crawl_retries_server_errors():
+    stub = GbifStub(failures={"/species/10/children": 2})
+    stats = HttpStats()
+    species = crawl(stub, ["Canidae"], stats=stats)
+    assert names(species) == ["Canis lupus", "Canis latrans", "Canis aureus", "Vulpes vulpes"]
+    host = stats.hosts[stub.url.split("//")[1]]
+    assert host.retries == 2 and host.statuses[503] == 2
+
+
+def test_crawl_resumes_from_cache_and_checkpoint(tmp_path):
+    db = str(tmp_path / "crawl.sqlite")
+
+    async def run():
+        async with GbifStub() as stub:
+            runs = []
+            for _ in range(2):
+                start = len(stub.requests)
+                species = await crawl_families(["Canidae"], base_url=stub.url, rate=1000, policy=FAST_RETRY,
+                                               cache=ResponseCache(db), checkpoint=CrawlCheckpoint(db))
+                runs.append((names(species), stub.requests[start:]))
+            return runs
+
+    (first, first_requests), (again, again_requests) = asyncio.run(run())
+    assert first == again == ["Canis lupus", "Canis latrans", "Canis aureus", "Vulpes vulpes"]
+    assert first_requests and not again_requests
+
+
+def test_response_cache_expiry(tmp_path):
+    db = str(tmp_path / "cache.sqlite")
+    ResponseCache(db).put("http://gbif/a", {"usageKey": 1})
+    forever = ResponseCache(db, ttl=None)
+    forever.purge_expired()
+    assert forever.get("http://gbif/a") == {"usageKey": 1}
+    expired = ResponseCache(db, ttl=0)
+    expired.purge_expired()
+    assert forever.get("http://gbif/a") is None
+
+
+def test_expired_checkpoint_is_crawled_again(tmp_path):
+    db = str(tmp_path / "crawl.sqlite")
+
+    async def run(ttl):
+        async with GbifStub() as stub:
+            for _ in range(2):
+                await crawl_families(["Canidae"], base_url=stub.url, rate=1000, policy=FAST_RETRY,
+                                     cache=ResponseCache(db, ttl=ttl), checkpoint=CrawlCheckpoint(db, ttl=ttl))
+            return stub.requests
+
+    requests = asyncio.run(run(ttl=0))
+    assert sum(path.startswith("/species/1/children") for path in requests) == 2
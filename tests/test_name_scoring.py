@@ -0,0 +1,33 @@
+import pandas as pd
+from genus_index import GenusFamilyIndex
+from name_scoring import NameScorer, load_generations, summarize
+
+
+def test_family_accuracy_leaves_out_unknown_families():
+    index = GenusFamilyIndex.from_mapping({"Canidae": ["Canis", "Vulpes"], "Ursidae": ["Ursus"]})
+    scorer = NameScorer({"color": ["red"]}, {"rufus": ["red"]}, index)
+    results = scorer.score_frame(pd.DataFrame({
+        "description": ["a red fox", "a wolf", "a bear", "a lizard", "a bat"],
+        "family": ["Canidae", "Canidae", "Ursidae", "Lacertidae", "Vespertilionidae"],
+        "generated_name": ["Vulpes rufus", "Ursus lupus", "Ursus minor", "Lacerta viridis", "Myotis speluncae"],
+    }))
+    assert results["family_valid"].tolist() == [True, False, True, None, None]
+    metrics = summarize(results)
+    assert metrics["family_accuracy"] == 2 / 3
+    assert metrics["family_coverage"] == 3 / 5
+    assert metrics["unknown_families"] == 2
+
+
+def test_load_generations_keeps_one_backend(tmp_path):
+    path = tmp_path / "results.parquet"
+    pd.DataFrame({
+        "backend": ["gpt2", "mock-upper-bound", "gpt2"],
+        "description": ["a red fox", "a wolf", "a bear"],
+        "family": ["Canidae", "Canidae", "Ursidae"],
+        "generated_name": ["Vulpes rufus", "Canis lupus", "Ursus minor"],
+        "format_valid": [True, True, True],
+    }).to_parquet(path)
+    df = load_generations(str(path), backend="gpt2")
+    assert df.columns.tolist() == ["description", "family", "generated_name"]
+    assert df["generated_name"].tolist() == ["Vulpes rufus", "Ursus minor"]
+    assert len(load_generations(str(path))) == 3
@@ -0,0 +1,55 @@
+import json
+import urllib.request
+import urllib.error
+import pytest
+from binomial.server import serve
+
+
+def fake_generate(pairs):
+    return [(f"{family[:-4] or 'Genus'} {description.split()[-1]}us", -1.0) for description, family in pairs]
+
+
+@pytest.fixture
+def server():
+    server = serve(port=0, generate_fn=fake_generate, fingerprint="test", max_wait_ms=5)
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.close()
+
+
+def request(url, body=None, raw=None):
+    data = raw if raw is not None else (json.dumps(body).encode() if body is not None else None)
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data), timeout=10) as r:
+            return r.status, json.loads(r.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_generate_round_trip(server):
+    assert request(server + "/health") == (200, {"status": "ok"})
+    status, body = request(server + "/generate", {"description": "a small fox", "family": "Canidae"})
+    assert status == 200 and body == {"results": [{"binomial": "Can foxus", "score": -1.0}]}
+    status, body = request(server + "/generate", {"items": [{"description": "a small fox", "family": "Canidae"},
+                                                            {"description": "a big bear"}]})
+    assert status == 200 and [r["binomial"] for r in body["results"]] == ["Can foxus", "Genus bearus"]
+    status, metrics = request(server + "/metrics")
+    assert metrics["requests"] == 2 and metrics["cache"]["hits"] == 1
+
+
+@pytest.mark.parametrize("body, error", [
+    ([{"description": "a fox"}], "body must be a JSON object"),
+    ({"description": None, "family": "Canidae"}, "body: 'description' must be a non-empty string"),
+    ({"description": "  "}, "body: 'description' must be a non-empty string"),
+    ({"family": "Canidae"}, "body: 'description' must be a non-empty string"),
+    ({"description": "a fox", "family": 3}, "body: 'family' must be a string"),
+    ({"items": []}, "'items' must be a non-empty list"),
+    ({"items": "a fox"}, "'items' must be a non-empty list"),
+    ({"items": [{"description": "a fox"}, "a bear"]}, "items[1] must be an object"),
+])
+def test_generate_rejects_bad_bodies(server, body, error):
+    assert request(server + "/generate", body) == (400, {"error": f"bad request: {error}"})
+
+
+def test_generate_rejects_invalid_json(server):
+    assert request(server + "/generate", raw=b"{not json") == (400, {"error": "bad request: body is not valid JSON"})
+    assert request(server + "/nowhere", {}) == (404, {"error": "not found"})
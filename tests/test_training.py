@@ -0,0 +1,30 @@
+import torch
+from transformers import GPT2Config, GPT2LMHeadModel
+from binomial.dataset import BinomialCollator
+from binomial.training import LengthBucketTrainer, training_arguments
+
+
+class TinyDataset(torch.utils.data.Dataset):
+    def __init__(self, lengths):
+        self.lengths = lengths
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def __getitem__(self, i):
+        ids = torch.arange(1, self.lengths[i] + 1)
+        return {"input_ids": ids, "attention_mask": torch.ones_like(ids), "labels": ids}
+
+
+def test_training_arguments_build(tmp_path):
+    args = training_arguments(str(tmp_path), epochs=2, batch_size=4, lr=1e-4)
+    assert args.num_train_epochs == 2 and args.per_device_train_batch_size == 4 and args.learning_rate == 1e-4
+
+
+def test_one_training_step_on_a_tiny_model(tmp_path):
+    model = GPT2LMHeadModel(GPT2Config(vocab_size=32, n_positions=16, n_embd=16, n_layer=1, n_head=2))
+    args = training_arguments(str(tmp_path), batch_size=2, max_steps=1, save_strategy="no", report_to=[],
+                              use_cpu=True)
+    trainer = LengthBucketTrainer(model=model, args=args, train_dataset=TinyDataset([3, 5, 4, 6]),
+                                  data_collator=BinomialCollator(0))
+    assert trainer.train().global_step == 1